@@ -3,12 +3,16 @@ nozyme-tap entry point.
 Usage: python -m nozyme_tap [--config tap_config.json] [--stdout] [--interface wlan1mon]
 
 Fast sensor pipeline:
-  tshark → classify_frame (5 checks) → wifi_frame → ZMQ to node
-  (parallel: watchdog monitors tshark health, channel hopper hops)
+  tshark → frame queue → classify_frame (5 checks) → wifi_frame → ZMQ to node
+  (parallel: frame worker drains the queue, watchdog monitors tshark health,
+   channel hopper hops)
 """
 
+import os
 import sys
 import json
+import array
+import atexit
 import signal
 import logging
 import argparse
@@ -17,18 +21,34 @@ import threading
 
 from nozyme_tap.system.config import TapConfig
 from nozyme_tap.core.capture import TsharkCapture, setup_monitor_mode, ChannelHopper, freq_to_channel
-from nozyme_tap.core.protocol import make_heartbeat, make_wifi_frame
-from nozyme_tap.core.quick_filter import classify_frame
-from nozyme_tap.system.health import get_system_health
+from nozyme_tap.core.protocol import make_heartbeat
+from nozyme_tap.core.quick_filter import classify_frame, preload_patterns
+from nozyme_tap.core.pipeline import FrameQueue
 
 try:
     import orjson
     _loads = orjson.loads
+
+    def _dumps_line(obj) -> bytes:
+        """Serialize obj to a newline-terminated JSON bytes line.
+
+        No default= hook: callers pass only JSON-native values (str, int,
+        float, None), so orjson never calls back into Python.
+        """
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
 except ImportError:
     _loads = json.loads
 
+    def _dumps_line(obj) -> bytes:
+        """Serialize obj to a newline-terminated JSON bytes line."""
+        return (json.dumps(obj) + "\n").encode()
+
 logger = logging.getLogger("nozyme_tap")
 
+# --stdout flushes every Nth drone frame; the frame worker also flushes each
+# time its queue drains, so a quiet stream is never left sitting in the buffer.
+_STDOUT_FLUSH_EVERY = 64
+
 # Global state for signal handler
 _shutdown = threading.Event()
 _capture = None
@@ -45,12 +65,16 @@ def setup_logging(level: str = "INFO"):
 
 
 def signal_handler(sig, frame):
-    """Handle Ctrl+C gracefully."""
+    """Handle Ctrl+C gracefully.
+
+    Only sets flags: the wakeup fd wakes read_lines(), and the main loop
+    stops tshark outside signal context.
+    """
     global _capture
     logger.info("Shutting down...")
     _shutdown.set()
     if _capture:
-        _capture.stop()
+        _capture.request_stop()
 
 
 def main():
@@ -91,7 +115,7 @@ def main():
     log_level = args.log_level or config.get("log_level", "INFO")
     setup_logging(log_level)
 
-    _start_time = time.time()
+    _start_time = time.monotonic()
     logger.info("nozyme-tap v0.2.0 starting (fast sensor mode)")
     logger.info(f"Config: {config.config_path}")
     logger.info(f"Tap UUID: {config.tap_uuid}")
@@ -101,7 +125,13 @@ def main():
     logger.info(f"Interface: {interface}")
     logger.info(f"Node: {config.node_host}:{config.node_port}")
 
-    # Setup signal handler
+    # Setup signal handler.  The wakeup pipe gets a byte on every signal so
+    # the capture reader's select() returns instead of blocking until the
+    # next tshark line.
+    wakeup_r, wakeup_w = os.pipe()
+    os.set_blocking(wakeup_r, False)
+    os.set_blocking(wakeup_w, False)
+    signal.set_wakeup_fd(wakeup_w)
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
@@ -130,9 +160,10 @@ def main():
     )
     logger.info(f"Channels: {band_info} (dwell={channel_dwell_ms}ms)")
 
-    # Frame stats
-    frames_parsed = 0
-    frames_forwarded = 0
+    # Frame stats: one flat unsigned array, updated in place by the frame
+    # worker (no nonlocal rebinding per frame); read by the main loop.
+    _PARSED, _FORWARDED = 0, 1
+    frame_counters = array.array("Q", [0, 0])
 
     # ---- ZMQ transport ----
 
@@ -147,6 +178,7 @@ def main():
                 tap_name=config.tap_name,
                 buffer_size=config.get("zmq_buffer_size", 1000),
                 sndhwm=config.get("zmq_hwm", 1000),
+                batch_size=config.get("zmq_batch_size", 32),
             )
             transport.start()
             logger.info("ZMQ transport started")
@@ -162,76 +194,117 @@ def main():
     pcap_recorder = None
     if config.get("pcap_enabled", False):
         try:
-            from nozyme_tap.core.pcap import PcapRecorder
-            pcap_recorder = PcapRecorder(
+            from nozyme_tap.core.pcap import PcapRecorder, TpacketPcapRecorder
+            pcap_kwargs = dict(
                 interface=interface,
                 pcap_path=config.get("pcap_path", "/var/lib/nozyme/pcap"),
                 filesize_kb=config.get("pcap_ring_filesize_kb", 10240),
                 num_files=config.get("pcap_ring_files", 10),
+                use_tmpfs=config.get("pcap_use_tmpfs", False),
             )
-            pcap_recorder.start()
+            if config.get("pcap_backend") == "tpacket":
+                pcap_recorder = TpacketPcapRecorder(**pcap_kwargs)
+                pcap_recorder.start()
+                if not pcap_recorder.is_running:
+                    logger.warning("TPACKET recorder unavailable, falling back to dumpcap")
+                    pcap_recorder = None
+            if pcap_recorder is None:
+                pcap_recorder = PcapRecorder(**pcap_kwargs)
+                pcap_recorder.start()
         except Exception as e:
             logger.warning(f"PCAP recorder failed to start: {e}")
 
+    # Optional CPU pinning for hot-path threads, e.g. {"worker": 1, "hopper": 2}.
+    # The main (tshark reader) thread is left unpinned: tshark, dumpcap and every
+    # thread started later would inherit its mask.
+    cpu_affinity = config.get("cpu_affinity") or {}
+
+    # ---- Channel hopper ----
+
+    channel_hopper = None
+    if len(all_channels) > 1:
+        channel_hopper = ChannelHopper(
+            interface=interface,
+            channels_by_band=channels_by_band,
+            dwell_ms=channel_dwell_ms,
+            active_dwell_multiplier=config.get("active_dwell_multiplier", 3.0),
+            activity_timeout_s=config.get("activity_timeout_s", 30.0),
+            cpu=cpu_affinity.get("hopper"),
+            rt_priority=config.get("hopper_rt_priority", 10),
+        )
+        channel_hopper.start()
+    elif all_channels:
+        logger.info(f"Single channel mode: channel {all_channels[0]}")
+
     # ---- Capture callback (the hot path) ----
 
-    def on_capture_line(line: str):
+    # Bind everything the callback touches to locals once, so each frame
+    # pays for fast local loads instead of global/attribute lookups.
+    preload_patterns()  # compile the pre-filter before the first frame arrives
+    _classify = classify_frame
+    _scratch = {}  # classify_frame result, reused (only the frame worker calls it)
+    _send = transport.make_wifi_frame_enqueuer(config.tap_uuid) if transport else None
+    _report = channel_hopper.report_activity if channel_hopper else None
+    _stdout_mode = args.stdout
+    _stdout_write = sys.stdout.buffer.write
+    _stdout_flush = sys.stdout.buffer.flush
+    _counters = frame_counters
+    if _stdout_mode:
+        atexit.register(_stdout_flush)  # emit the tail of the last batch
+
+    def on_capture_line(line: bytes):
         """Classify frame and forward only drone-related frames."""
-        nonlocal frames_parsed, frames_forwarded
-
-        result = classify_frame(line)
+        result = _classify(line, _scratch)
         if result is None:
             return
 
-        frames_parsed += 1
+        _counters[_PARSED] += 1
+        mac = result["mac"]
+        rssi = result["rssi"]
+        ch = result["channel"]
+        frame_type = result["frame_type"]
 
-        if transport:
+        if _send:
             try:
-                transport.send_wifi_frame(make_wifi_frame(
-                    tap_uuid=config.tap_uuid,
-                    mac=result["mac"],
-                    rssi=result["rssi"],
-                    channel=result["channel"],
-                    frame_type=result["frame_type"],
-                    raw_fields=result["layers"],
-                ))
-                frames_forwarded += 1
+                _send(mac, rssi, ch, frame_type, result["layers"])
+                _counters[_FORWARDED] += 1
             except Exception as e:
                 logger.error(f"ZMQ send failed: {e}")
 
-        if args.stdout:
-            print(json.dumps({
-                "frame_type": result["frame_type"],
-                "mac": result["mac"],
-                "rssi": result["rssi"],
-                "channel": result["channel"],
-            }, default=str))
+        if _stdout_mode:
+            _stdout_write(_dumps_line({
+                "frame_type": frame_type,
+                "mac": mac,
+                "rssi": rssi,
+                "channel": ch,
+            }))
+            if not _counters[_PARSED] % _STDOUT_FLUSH_EVERY:
+                _stdout_flush()
 
         # Report channel activity to hopper for adaptive dwell
-        if channel_hopper and result["channel"]:
-            channel_hopper.report_activity(result["channel"])
+        if _report and ch:
+            _report(ch)
+
+    # tshark reader only enqueues; the frame worker thread classifies and sends
+    frame_queue = FrameQueue(
+        handler=on_capture_line,
+        maxlen=config.get("frame_queue_size", 4096),
+        on_idle=transport.flush if transport else (_stdout_flush if _stdout_mode else None),
+        cpu=cpu_affinity.get("worker"),
+    )
+    frame_queue.start()
 
     _capture = TsharkCapture(
         interface=interface,
         tshark_path=config.tshark_path,
-        on_line=on_capture_line,
+        on_line=frame_queue.put,
+        snaplen=config.get("tshark_snaplen", 0),
+        buffer_mb=config.get("tshark_buffer_mb", 16),
+        cpu=cpu_affinity.get("tshark"),
+        stderr_path=config.get("tshark_stderr_log"),
+        wakeup_fd=wakeup_r,
     )
 
-    # ---- Channel hopper ----
-
-    channel_hopper = None
-    if len(all_channels) > 1:
-        channel_hopper = ChannelHopper(
-            interface=interface,
-            channels_by_band=channels_by_band,
-            dwell_ms=channel_dwell_ms,
-            active_dwell_multiplier=config.get("active_dwell_multiplier", 3.0),
-            activity_timeout_s=config.get("activity_timeout_s", 30.0),
-        )
-        channel_hopper.start()
-    elif all_channels:
-        logger.info(f"Single channel mode: channel {all_channels[0]}")
-
     # ---- Watchdog (monitors tshark, auto-restarts) ----
 
     watchdog = None
@@ -255,10 +328,17 @@ def main():
 
     # ---- Main capture loop ----
 
-    last_heartbeat = 0
-    last_stats = 0
+    last_heartbeat = float("-inf")  # fire on the first clock sample
+    last_stats = float("-inf")
+    last_dropped = 0
     heartbeat_interval = config.get("heartbeat_interval_s", 10)
     restart_delay = config.get("tshark_restart_delay_s", 1)
+    # Snapshot constant config values so the loop never touches config.data
+    tap_uuid = config.tap_uuid
+    tap_name = config.tap_name
+    latitude = config.latitude
+    longitude = config.longitude
+    default_channel = all_channels[0] if all_channels else 6
     watchdog_started = False
 
     logger.info("Starting capture...")
@@ -274,33 +354,41 @@ def main():
                     logger.info("Watchdog started")
                     watchdog_started = True
 
+                # Signals wake read_lines through the wakeup fd and end it; the
+                # per-line flag check is for the watchdog's memory-pressure
+                # exit, which only sets the event. Periodic work runs once per
+                # stdout chunk, on read_lines' own timestamp for it.
+                last_chunk = None
                 for line in _capture.read_lines():
                     if _shutdown.is_set():
                         break
-
-                    now = time.time()
+                    now = _capture.chunk_time
+                    if now == last_chunk:
+                        continue
+                    last_chunk = now
 
                     # Periodic heartbeat
                     if transport and (now - last_heartbeat) >= heartbeat_interval:
                         try:
+                            from nozyme_tap.system.health import get_system_health
                             health = get_system_health()
                         except Exception:
                             health = {"cpu_load": 0.0, "memory_used": 0}
 
-                        current_ch = channel_hopper.current_channel if channel_hopper else (all_channels[0] if all_channels else 6)
+                        current_ch = channel_hopper.current_channel if channel_hopper else default_channel
                         cap_stats_hb = _capture.stats
                         hb = make_heartbeat(
-                            tap_uuid=config.tap_uuid,
-                            tap_name=config.tap_name,
+                            tap_uuid=tap_uuid,
+                            tap_name=tap_name,
                             interface=interface,
                             channel=current_ch,
                             cpu_load=health.get("cpu_load", 0.0),
                             memory_used=health.get("memory_used", 0),
                             memory_percent=health.get("memory_percent", 0.0),
-                            latitude=config.latitude,
-                            longitude=config.longitude,
+                            latitude=latitude,
+                            longitude=longitude,
                             frames_total=cap_stats_hb.get("lines_read", 0),
-                            frames_parsed=frames_parsed,
+                            frames_parsed=frame_counters[_PARSED],
                             tshark_running=_capture.is_running,
                             cpu_percent=health.get("cpu_percent", 0.0),
                             temperature=health.get("temperature"),
@@ -334,11 +422,24 @@ def main():
                                 f"/{ts['errors']} errors"
                                 f" ({ts['buffer_count']} queued)"
                             )
+                        qs = frame_queue.stats
+                        queue_info = (
+                            f", queue: {qs['depth']} pending"
+                            f"/{qs['dropped']} dropped"
+                        )
+                        if qs["dropped"] > last_dropped:
+                            logger.warning(
+                                f"Frame queue dropped {qs['dropped'] - last_dropped} lines "
+                                f"since last stats — frame worker is not keeping up with tshark"
+                            )
+                            last_dropped = qs["dropped"]
                         lines_total = cap_stats.get('lines_read', 0)
+                        frames_parsed, frames_forwarded = frame_counters
                         logger.info(
                             f"Stats: {lines_total} lines, "
                             f"{frames_parsed} drone ({frames_forwarded} fwd), "
                             f"{lines_total - frames_parsed} filtered"
+                            f"{queue_info}"
                             f"{hopper_info}"
                             f"{zmq_info}"
                         )
@@ -364,6 +465,10 @@ def main():
         logger.info("Shutting down...")
         if _capture:
             _capture.stop()
+        try:
+            frame_queue.stop()
+        except Exception as e:
+            logger.debug(f"Error stopping frame worker: {e}")
         if channel_hopper:
             try:
                 channel_hopper.stop()
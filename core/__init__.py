@@ -1,6 +1,7 @@
 """nozyme-tap core: capture → classify → forward."""
 from .capture import TsharkCapture, setup_monitor_mode, ChannelHopper, set_channel
 from .quick_filter import classify_frame
+from .pipeline import FrameQueue
 
 
 def __getattr__(name):
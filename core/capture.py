@@ -1,26 +1,38 @@
 """
 nozyme-tap tshark capture manager.
 Spawns tshark as a subprocess, reads NDJSON from stdout line-by-line,
-feeds each line to the parser.
+feeds each line (as raw bytes) to the parser.
 
 Key design:
-- Auto monitor mode setup (iw/ip or airmon-ng fallback)
+- Auto monitor mode setup (netlink, then iw/ip, then airmon-ng fallback)
 - Channel hopping across configured channel list
-- tshark runs as a long-lived subprocess
+- tshark runs as a long-lived subprocess.  It is deliberately not replaced
+  by an in-process libpcap dissector: wifi_frame.raw_fields carries every
+  tshark-dissected field (PROTOCOL.md), and the node's FrameRouter
+  classifies on that EK layout
 - stdout is read line-by-line (one JSON per line with -T ek)
-- stderr is logged for diagnostics
+- stderr goes straight to our own stderr (journald) or a log file — no
+  Python reader thread
 - Process is restarted automatically on crash (by watchdog)
-- Non-blocking readline with configurable timeout
+- stdout is multiplexed with a signal wakeup pipe, so Ctrl-C returns
+  from read_lines() immediately instead of waiting for the next line
 """
 
 import os
+import array
+import fcntl
+import math
 import signal
+import socket
+import selectors
 import subprocess
 import threading
 import logging
 import time
 import shutil
-from typing import Callable, Dict, Optional, List
+from typing import Callable, Dict, Optional, List, Tuple
+
+from nozyme_tap.system.affinity import pin_current_thread, set_realtime_priority
 
 logger = logging.getLogger(__name__)
 
@@ -30,12 +42,37 @@ def _is_root() -> bool:
     return os.geteuid() == 0
 
 
+# Resolved tool paths (None = not installed), filled on first lookup.
+# Setup runs again on every watchdog restart; $PATH is only walked once.
+_tool_paths: Dict[str, Optional[str]] = {}
+
+
+def _which(tool: str) -> Optional[str]:
+    """shutil.which(), memoized for the life of the process."""
+    try:
+        return _tool_paths[tool]
+    except KeyError:
+        path = _tool_paths[tool] = shutil.which(tool)
+        return path
+
+
+def invalidate_tool_cache():
+    """Forget resolved tool paths (e.g. after installing iw at runtime)."""
+    _tool_paths.clear()
+
+
 def _run_cmd(cmd: List[str], timeout: int = 10) -> tuple:
     """Run a shell command, return (success, stdout, stderr).
     Strips 'sudo' prefix when already running as root to avoid pam log noise.
+    The tool is run by its cached absolute path, so exec skips the $PATH walk.
     """
     if _is_root() and cmd and cmd[0] == "sudo":
         cmd = cmd[1:]
+    if cmd:
+        i = 1 if cmd[0] == "sudo" and len(cmd) > 1 else 0
+        path = _which(cmd[i])
+        if path:
+            cmd = cmd[:i] + [path] + cmd[i + 1:]
     try:
         result = subprocess.run(
             cmd, capture_output=True, text=True, timeout=timeout
@@ -48,11 +85,41 @@ def _run_cmd(cmd: List[str], timeout: int = 10) -> tuple:
         return False, "", f"{cmd[0]} not found"
 
 
+def _process_running(comm: str) -> bool:
+    """Check /proc for a process whose comm is exactly `comm` (no fork)."""
+    try:
+        pids = [d for d in os.listdir("/proc") if d.isdigit()]
+    except OSError:
+        return True  # can't tell — assume running
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/comm") as f:
+                if f.read().rstrip("\n") == comm:
+                    return True
+        except OSError:
+            continue
+    return False
+
+
+def _release_interface(interface: str):
+    """Take the interface away from NetworkManager and wpa_supplicant.
+
+    Each step is skipped when its daemon isn't running — the common case on
+    a watchdog-driven re-setup, where a prior run already released it.
+    """
+    # Release interface from NetworkManager (don't kill the service)
+    if _which("nmcli") and _process_running("NetworkManager"):
+        _run_cmd(["sudo", "nmcli", "device", "set", interface, "managed", "no"])
+    # Kill wpa_supplicant which interferes with monitor mode
+    if _process_running("wpa_supplicant"):
+        _run_cmd(["sudo", "systemctl", "stop", "wpa_supplicant"])
+
+
 def setup_monitor_mode(interface: str, channel: int = None) -> str:
     """
     Put a WiFi interface into monitor mode.
 
-    Tries iw/ip first, falls back to airmon-ng.
+    Tries netlink first (no iw/ip forks), then iw/ip, then airmon-ng.
     Returns the monitor interface name (may differ from input if airmon-ng
     renames it, e.g. wlan1 -> wlan1mon).
 
@@ -66,25 +133,41 @@ def setup_monitor_mode(interface: str, channel: int = None) -> str:
     logger.info(f"Setting up monitor mode on {interface}")
 
     # Check if already in monitor mode
-    ok, stdout, _ = _run_cmd(["iw", "dev", interface, "info"])
-    if ok and "type monitor" in stdout:
+    if _is_monitor_mode(interface):
         logger.info(f"{interface} already in monitor mode")
         if channel:
             set_channel(interface, channel)
         return interface
 
-    # Method 1: iw/ip (preferred - no rename)
-    has_iw = shutil.which("iw") is not None
-    has_ip = shutil.which("ip") is not None
+    released = False
+
+    # Method 1: nl80211 + rtnetlink (preferred - no rename, no iw/ip forks)
+    if _nl80211 and _is_root():
+        ifindex = _get_ifindex(interface)
+        if ifindex:
+            logger.info(f"Using netlink to enable monitor mode on {interface}")
+            _release_interface(interface)
+            released = True
+
+            # Down -> monitor -> up
+            if (set_link_up(ifindex, False)
+                    and _nl80211.set_iftype(ifindex, NL80211_IFTYPE_MONITOR)
+                    and set_link_up(ifindex, True)):
+                logger.info(f"{interface} is now in monitor mode")
+                if channel:
+                    set_channel(interface, channel)
+                return interface
+            logger.warning(f"netlink method failed on {interface}, trying iw/ip")
+
+    # Method 2: iw/ip (no rename)
+    has_iw = _which("iw") is not None
+    has_ip = _which("ip") is not None
 
     if has_iw and has_ip:
         logger.info(f"Using iw/ip to enable monitor mode on {interface}")
-
-        # Release interface from NetworkManager (don't kill the service)
-        if shutil.which("nmcli"):
-            _run_cmd(["sudo", "nmcli", "device", "set", interface, "managed", "no"])
-        # Kill wpa_supplicant which interferes with monitor mode
-        _run_cmd(["sudo", "systemctl", "stop", "wpa_supplicant"])
+        if not released:
+            _release_interface(interface)
+            released = True
 
         # Down -> monitor -> up
         ok1, _, err1 = _run_cmd(["sudo", "ip", "link", "set", interface, "down"])
@@ -99,29 +182,26 @@ def setup_monitor_mode(interface: str, channel: int = None) -> str:
         else:
             logger.warning(f"iw/ip method failed: {err1} {err2} {err3}")
 
-    # Method 2: airmon-ng fallback
-    if shutil.which("airmon-ng"):
+    # Method 3: airmon-ng fallback
+    if _which("airmon-ng"):
         logger.info(f"Falling back to airmon-ng for {interface}")
         # Release interface from NM before airmon-ng (avoid airmon-ng check kill which stops NM)
-        if shutil.which("nmcli"):
-            _run_cmd(["sudo", "nmcli", "device", "set", interface, "managed", "no"])
-        _run_cmd(["sudo", "systemctl", "stop", "wpa_supplicant"])
+        if not released:
+            _release_interface(interface)
         ok, stdout, stderr = _run_cmd(["sudo", "airmon-ng", "start", interface])
 
         if ok:
             # airmon-ng may rename: wlan1 -> wlan1mon
             mon_iface = interface + "mon"
             # Check if renamed interface exists
-            ok_check, out, _ = _run_cmd(["iw", "dev", mon_iface, "info"])
-            if ok_check:
+            if _is_monitor_mode(mon_iface) is not None:
                 logger.info(f"airmon-ng created {mon_iface}")
                 if channel:
                     set_channel(mon_iface, channel)
                 return mon_iface
 
             # Maybe it kept the same name
-            ok_check, out, _ = _run_cmd(["iw", "dev", interface, "info"])
-            if ok_check and "type monitor" in out:
+            if _is_monitor_mode(interface):
                 logger.info(f"airmon-ng: {interface} in monitor mode (no rename)")
                 if channel:
                     set_channel(interface, channel)
@@ -135,6 +215,33 @@ def setup_monitor_mode(interface: str, channel: int = None) -> str:
     )
 
 
+def reset_monitor_interface(interface: str, channel: int) -> bool:
+    """
+    Cycle an interface down -> monitor -> up and retune it, over netlink.
+
+    The watchdog's recovery path for a wedged driver: unlike
+    setup_monitor_mode, the down/up cycle runs even if the interface is
+    already in monitor mode.
+
+    Returns:
+        True on success; False if netlink isn't usable (no nl80211, not
+        root, interface gone) or a step failed, so the caller can fall
+        back to ip/iw.
+    """
+    if not (_nl80211 and _is_root()):
+        return False
+    _ifindex_cache.pop(interface, None)  # a wedged interface may have been recreated
+    ifindex = _get_ifindex(interface)
+    if not ifindex:
+        return False
+    if not (set_link_up(ifindex, False)
+            and _nl80211.set_iftype(ifindex, NL80211_IFTYPE_MONITOR)
+            and set_link_up(ifindex, True)):
+        logger.warning(f"netlink reset failed on {interface}")
+        return False
+    return set_channel(interface, channel)
+
+
 # --- Frequency-to-channel mapping ---
 
 # 2.4 GHz: channels 1-14
@@ -164,50 +271,102 @@ _CHANNEL_TO_FREQ.update({ch: freq for freq, ch in _FREQ_24GHZ.items()})
 
 
 # --- Interface index cache (for netlink) ---
-_ifindex_cache: Dict[str, int] = {}
+# name -> (ifindex, expiry on time.monotonic()).  Entries expire so a
+# renamed/recreated interface (airmon-ng, NetworkManager) is re-read, and
+# set_channel() drops an entry as soon as netlink rejects its ifindex.
+_IFINDEX_TTL_S = 30.0
+_ifindex_cache: Dict[str, Tuple[int, float]] = {}
 
 
 def _get_ifindex(interface: str) -> Optional[int]:
-    """Get interface index from sysfs, cached."""
+    """Get interface index (SIOCGIFINDEX via if_nametoindex), cached for _IFINDEX_TTL_S."""
+    now = time.monotonic()
     cached = _ifindex_cache.get(interface)
-    if cached is not None:
-        return cached
+    if cached is not None and cached[1] > now:
+        return cached[0]
     try:
-        with open(f"/sys/class/net/{interface}/ifindex") as f:
-            idx = int(f.read().strip())
-        if len(_ifindex_cache) >= 100:
-            _ifindex_cache.clear()
-        _ifindex_cache[interface] = idx
-        return idx
+        # One ioctl instead of open/read/close on sysfs (~4us vs ~13us)
+        idx = socket.if_nametoindex(interface)
     except (OSError, ValueError):
+        _ifindex_cache.pop(interface, None)
         return None
+    _ifindex_cache[interface] = (idx, now + _IFINDEX_TTL_S)
+    return idx
 
 
 # --- Netlink channel control (zero-fork fast path) ---
 _nl80211 = None
 try:
-    from nozyme_tap.system.netlink import NL80211Channel
+    from nozyme_tap.system.netlink import NL80211Channel, NL80211_IFTYPE_MONITOR, set_link_up
     _nl80211 = NL80211Channel()
 except Exception as _e:
     logger.warning(f"Netlink init failed, using subprocess fallback: {_e}")
 
 
-def set_channel(interface: str, channel: int) -> bool:
-    """Set the WiFi channel on a monitor-mode interface.
+def _is_monitor_mode(interface: str) -> Optional[bool]:
+    """Check whether an interface is in monitor mode.
 
-    Uses raw nl80211 netlink when available (<1ms), falls back to subprocess iw (~50ms).
+    Asks nl80211 directly (no fork); falls back to parsing `iw dev <if> info`.
+    Returns None if the interface does not exist (or cannot be queried).
     """
     if _nl80211:
-        freq = _CHANNEL_TO_FREQ.get(channel)
+        # Setup may recreate the interface (airmon-ng) — never trust the cache here
+        _ifindex_cache.pop(interface, None)
         ifindex = _get_ifindex(interface)
-        if freq and ifindex:
-            ok = _nl80211.set_channel(ifindex, freq)
-            if ok:
-                logger.debug(f"Set {interface} to channel {channel} (netlink)")
-                return True
-            logger.debug(f"Netlink set_channel failed for ch {channel} freq={freq} ifindex={ifindex}, falling back to iw")
-        else:
+        if ifindex:
+            info = _nl80211.get_interface(ifindex)
+            if info is not None:
+                return info["iftype"] == NL80211_IFTYPE_MONITOR
+    ok, stdout, _ = _run_cmd(["iw", "dev", interface, "info"])
+    if not ok:
+        return None
+    return "type monitor" in stdout
+
+
+# Netlink circuit breaker: a transient failure (EBUSY during a scan) gets a
+# quick retry on netlink; only a run of failures parks an interface on the
+# iw fallback, and netlink is probed again once the backoff expires.
+_NL_RETRY_DELAY_S = 0.005
+_NL_MAX_FAILURES = 5
+_NL_BACKOFF_S = 10.0
+_nl_failures: Dict[str, int] = {}
+_nl_backoff_until: Dict[str, float] = {}
+
+
+def _netlink_set_channel(interface: str, channel: int) -> bool:
+    """One netlink attempt (plus a single retry); False means use iw."""
+    freq = _CHANNEL_TO_FREQ.get(channel)
+    for attempt in range(2):
+        ifindex = _get_ifindex(interface)
+        if not (freq and ifindex):
             logger.warning(f"Netlink lookup failed: channel={channel} freq={freq} ifindex={ifindex}")
+            return False
+        if _nl80211.set_channel(ifindex, freq):
+            return True
+        _ifindex_cache.pop(interface, None)  # index may be stale; re-read on retry
+        if not attempt:
+            time.sleep(_NL_RETRY_DELAY_S)
+    logger.debug(f"Netlink set_channel failed for ch {channel} freq={freq} ifindex={ifindex}, falling back to iw")
+    return False
+
+
+def set_channel(interface: str, channel: int) -> bool:
+    """Set the WiFi channel on a monitor-mode interface.
+
+    Uses raw nl80211 netlink when available (<1ms), falls back to subprocess iw (~50ms).
+    """
+    if _nl80211 and _nl_backoff_until.get(interface, 0.0) <= time.monotonic():
+        if _netlink_set_channel(interface, channel):
+            _nl_failures.pop(interface, None)
+            logger.debug(f"Set {interface} to channel {channel} (netlink)")
+            return True
+        failures = _nl_failures[interface] = _nl_failures.get(interface, 0) + 1
+        if failures >= _NL_MAX_FAILURES:
+            logger.warning(
+                f"Netlink failed {failures}x on {interface}, using iw for {_NL_BACKOFF_S:.0f}s"
+            )
+            _nl_backoff_until[interface] = time.monotonic() + _NL_BACKOFF_S
+            _nl_failures[interface] = 0
     # Fallback: subprocess iw
     ok, _, err = _run_cmd(["sudo", "iw", "dev", interface, "set", "channel", str(channel)])
     if ok:
@@ -217,14 +376,11 @@ def set_channel(interface: str, channel: int) -> bool:
     return ok
 
 
-def freq_to_channel(freq_mhz: int) -> Optional[int]:
-    """Convert a radiotap frequency (MHz) to a WiFi channel number.
-
-    Returns None if the frequency doesn't map to a known channel.
-    """
-    if freq_mhz is None:
-        return None
-    return _FREQ_TO_CHANNEL.get(freq_mhz)
+# freq_to_channel(freq_mhz) -> Optional[int]: convert a radiotap frequency
+# (MHz) to a WiFi channel number; None if it doesn't map to a known channel
+# (including freq_mhz=None).  Bound dict.get — no Python frame per call; a
+# dict hit on a small int is already faster than an array LUT in CPython.
+freq_to_channel: Callable[[Optional[int]], Optional[int]] = _FREQ_TO_CHANNEL.get
 
 
 # Band scan frequency constants
@@ -235,6 +391,9 @@ _SCAN_FREQ_6GHZ = 10   # Scan 6 GHz every Nth cycle
 _NAN_DISCOVERY_CH = 6
 _NAN_DWELL_MULTIPLIER = 2.0  # Extra dwell on channel 6 for NAN discovery
 
+# Channel numbers are < 256 in every band (2.4: 1-14, 5: 32-177, 6: 1-233)
+_MAX_CHANNEL = 256
+
 # Adaptive behavior thresholds
 _FAST_RR_MAX = 3        # <= this many channels: fast round-robin
 _BAND_PRIORITY_MAX = 8  # <= this many channels: band-prioritized
@@ -270,57 +429,120 @@ class ChannelHopper:
         active_dwell_multiplier: float = 3.0,
         activity_timeout_s: float = 30.0,
         idle_scan_interval_s: float = 5.0,
+        cpu: Optional[int] = None,
+        rt_priority: int = 0,
     ):
         self.interface = interface
-        self.channels_by_band = {
-            b: list(chs) for b, chs in channels_by_band.items() if chs
+        # Tuples: iterated every hop cycle, never mutated
+        self.channels_by_band: Dict[str, Tuple[int, ...]] = {
+            b: tuple(chs) for b, chs in channels_by_band.items() if chs
         }
         self.dwell_ms = dwell_ms
         self.active_dwell_multiplier = active_dwell_multiplier
         self.activity_timeout_s = activity_timeout_s
         self.idle_scan_interval_s = idle_scan_interval_s
+        self.cpu = cpu  # optional CPU to pin the hopper thread to
+        # SCHED_FIFO priority for the hopper thread (0 = normal scheduling):
+        # keeps dwell timing steady when capture load saturates the CPUs
+        self.rt_priority = rt_priority
 
-        # Flat channel list and reverse lookup
-        self.all_channels: List[int] = []
+        # Flat channel tuple and reverse lookup
+        all_channels: List[int] = []
         self.channel_band: Dict[int, str] = {}
         for band in ("24ghz", "5ghz", "6ghz"):
-            for ch in channels_by_band.get(band, []):
-                self.all_channels.append(ch)
+            for ch in channels_by_band.get(band, ()):
+                all_channels.append(ch)
                 self.channel_band[ch] = band
+        self.all_channels: Tuple[int, ...] = tuple(all_channels)
 
         self._total = len(self.all_channels)
+        self._scan_cycles = self._build_scan_cycles()
         self._running = False
         self._thread: Optional[threading.Thread] = None
+        # No lock anywhere in the hopper: _current_channel, _mode and _stats
+        # are written only by the hopper thread, and readers take GIL-atomic
+        # snapshots (attribute load, dict copy).
         self._current_channel = 0
-        self._lock = threading.Lock()
-        self._channel_activity: Dict[int, float] = {}  # channel -> last_activity_time
+        # Last activity time (time.monotonic()) per channel number, indexed
+        # directly by channel.  Lock-free on both sides: a single array slot
+        # store/load is atomic under the GIL.
+        # -inf = never seen (monotonic time can be below the timeout after boot).
+        self._channel_activity = array.array("d", [float("-inf")]) * _MAX_CHANNEL
+        # Channels reported since they last expired, so the activity sweep
+        # visits a handful of slots instead of all _MAX_CHANNEL.  set.add is
+        # atomic under the GIL; only the hopper thread discards.
+        self._touched: set = set()
         self._mode = "scanning"  # "scanning" or "tracking"
         self._stats = {"hops": 0, "errors": 0, "active_dwells": 0}
 
+    def _build_scan_cycles(self) -> Tuple[Tuple[Tuple[int, float], ...], ...]:
+        """Precompute the band-priority scanning schedule.
+
+        One entry per scan cycle, each a tuple of (channel, dwell_s) steps,
+        covering a full lcm(5 GHz freq, 6 GHz freq) super-cycle after which
+        the pattern repeats.  Cycles with no channels are dropped.
+        """
+        base_dwell = self.dwell_ms / 1000.0
+
+        # For 9+ channels, slow down secondary band scanning
+        heavy_mode = self._total > _BAND_PRIORITY_MAX
+        freq_5 = _SCAN_FREQ_5GHZ * (2 if heavy_mode else 1)
+        freq_6 = _SCAN_FREQ_6GHZ * (2 if heavy_mode else 1)
+        length = freq_5 * freq_6 // math.gcd(freq_5, freq_6)
+
+        # 2.4 GHz: every cycle (channel 6 gets extra NAN discovery dwell)
+        steps_24 = tuple(
+            (ch, base_dwell * _NAN_DWELL_MULTIPLIER if ch == _NAN_DISCOVERY_CH else base_dwell)
+            for ch in self.channels_by_band.get("24ghz", [])
+        )
+        steps_5 = tuple((ch, base_dwell) for ch in self.channels_by_band.get("5ghz", []))
+        steps_6 = tuple((ch, base_dwell) for ch in self.channels_by_band.get("6ghz", []))
+
+        cycles = []
+        for cycle in range(length):
+            steps = steps_24
+            if cycle % freq_5 == 0:
+                steps += steps_5
+            if cycle % freq_6 == 0:
+                steps += steps_6
+            if steps:
+                cycles.append(steps)
+        return tuple(cycles)
+
     def report_activity(self, channel: int):
         """Report drone activity on a channel."""
-        if channel is None:
+        if not channel or channel >= _MAX_CHANNEL:
             return
-        with self._lock:
-            self._channel_activity[channel] = time.time()
+        self._channel_activity[channel] = time.monotonic()
+        self._touched.add(channel)
 
     def _get_active_channels(self) -> List[int]:
-        """Return channels with activity within the timeout window."""
-        now = time.time()
-        cutoff = now - self.activity_timeout_s
-        with self._lock:
-            active = [ch for ch, t in self._channel_activity.items() if t > cutoff]
+        """Return channels with activity within the timeout window (ascending).
+
+        Also expires channels from the touched set.
+        """
+        cutoff = time.monotonic() - self.activity_timeout_s
+        activity = self._channel_activity
+        touched = self._touched
+        active = []
+        for ch in sorted(touched):  # sorted() snapshots the set
+            if activity[ch] > cutoff:
+                active.append(ch)
+                continue
+            touched.discard(ch)
+            if activity[ch] > cutoff:  # reported again while we were discarding
+                touched.add(ch)
+                active.append(ch)
         return active
 
     def _set_channel(self, ch: int) -> bool:
         """Set channel on the interface, update current_channel and stats."""
         ok = set_channel(self.interface, ch)
-        with self._lock:
-            if ok:
-                self._current_channel = ch
-                self._stats["hops"] += 1
-            else:
-                self._stats["errors"] += 1
+        if ok:
+            self._current_channel = ch
+            self._stats["hops"] += 1
+        else:
+            self._stats["errors"] += 1
         return ok
 
     def start(self):
@@ -366,7 +588,13 @@ class ChannelHopper:
 
     def _hop_loop_fast_rr(self):
         """Simple round-robin with aggressive tracking dwell for small channel sets."""
+        pin_current_thread(self.cpu, "channel-hopper")
+        set_realtime_priority(self.rt_priority, "channel-hopper")
         base_dwell = self.dwell_ms / 1000.0
+        active_dwell = base_dwell * self.active_dwell_multiplier
+        all_channels = self.all_channels
+        set_ch = self._set_channel
+        sleep = time.sleep
         last_idle_scan = time.time()
 
         while self._running:
@@ -376,31 +604,30 @@ class ChannelHopper:
                 if not active:
                     # Scanning: plain round-robin
                     self._mode = "scanning"
-                    for ch in self.all_channels:
+                    for ch in all_channels:
                         if not self._running:
                             return
-                        self._set_channel(ch)
-                        time.sleep(base_dwell)
+                        set_ch(ch)
+                        sleep(base_dwell)
                 else:
                     # Tracking: extended dwell on active, periodic idle scan
                     self._mode = "tracking"
                     for ch in active:
                         if not self._running:
                             return
-                        self._set_channel(ch)
-                        with self._lock:
-                            self._stats["active_dwells"] += 1
-                        time.sleep(base_dwell * self.active_dwell_multiplier)
+                        set_ch(ch)
+                        self._stats["active_dwells"] += 1
+                        sleep(active_dwell)
 
                     now = time.time()
                     if (now - last_idle_scan) >= self.idle_scan_interval_s:
                         active_set = set(active)
-                        for ch in self.all_channels:
+                        for ch in all_channels:
                             if not self._running:
                                 return
                             if ch not in active_set:
-                                self._set_channel(ch)
-                                time.sleep(base_dwell)
+                                set_ch(ch)
+                                sleep(base_dwell)
                         last_idle_scan = time.time()
             except Exception as e:
                 logger.error(f"Channel hopper error (fast_rr): {e}", exc_info=True)
@@ -410,15 +637,20 @@ class ChannelHopper:
 
     def _hop_loop_band_priority(self):
         """Band-aware scanning with priority tiers and tracking mode."""
+        pin_current_thread(self.cpu, "channel-hopper")
+        set_realtime_priority(self.rt_priority, "channel-hopper")
         base_dwell = self.dwell_ms / 1000.0
+        active_dwell = base_dwell * self.active_dwell_multiplier
+        all_channels = self.all_channels
+        channels_by_band = self.channels_by_band
+        channel_band = self.channel_band
+        set_ch = self._set_channel
+        sleep = time.sleep
+        scan_cycles = self._scan_cycles
+        n_cycles = len(scan_cycles)
         cycle_count = 0
         last_idle_scan = time.time()
 
-        # For 9+ channels, slow down secondary band scanning
-        heavy_mode = self._total > _BAND_PRIORITY_MAX
-        freq_5 = _SCAN_FREQ_5GHZ * (2 if heavy_mode else 1)
-        freq_6 = _SCAN_FREQ_6GHZ * (2 if heavy_mode else 1)
-
         while self._running:
             try:
                 active = self._get_active_channels()
@@ -427,31 +659,14 @@ class ChannelHopper:
                     # --- Scanning mode ---
                     self._mode = "scanning"
 
-                    # 2.4 GHz: every cycle (channel 6 gets extra NAN discovery dwell)
-                    for ch in self.channels_by_band.get("24ghz", []):
+                    # Precomputed cycle: 2.4 GHz always, 5/6 GHz every Nth
+                    for ch, dwell in scan_cycles[cycle_count]:
                         if not self._running:
                             return
-                        self._set_channel(ch)
-                        dwell = base_dwell * _NAN_DWELL_MULTIPLIER if ch == _NAN_DISCOVERY_CH else base_dwell
-                        time.sleep(dwell)
-
-                    # 5 GHz: every Nth cycle
-                    if cycle_count % freq_5 == 0:
-                        for ch in self.channels_by_band.get("5ghz", []):
-                            if not self._running:
-                                return
-                            self._set_channel(ch)
-                            time.sleep(base_dwell)
-
-                    # 6 GHz: every Nth cycle
-                    if cycle_count % freq_6 == 0:
-                        for ch in self.channels_by_band.get("6ghz", []):
-                            if not self._running:
-                                return
-                            self._set_channel(ch)
-                            time.sleep(base_dwell)
+                        set_ch(ch)
+                        sleep(dwell)
 
-                    cycle_count += 1
+                    cycle_count = (cycle_count + 1) % n_cycles
                 else:
                     # --- Tracking mode ---
                     self._mode = "tracking"
@@ -460,33 +675,32 @@ class ChannelHopper:
                     for ch in active:
                         if not self._running:
                             return
-                        self._set_channel(ch)
-                        with self._lock:
-                            self._stats["active_dwells"] += 1
-                        time.sleep(base_dwell * self.active_dwell_multiplier)
+                        set_ch(ch)
+                        self._stats["active_dwells"] += 1
+                        sleep(active_dwell)
 
                     # Also scan idle channels in the same band(s) as active ones
                     active_set = set(active)
-                    active_bands = {self.channel_band.get(ch) for ch in active}
+                    active_bands = {channel_band.get(ch) for ch in active}
                     for band in active_bands:
                         if band is None:
                             continue
-                        for ch in self.channels_by_band.get(band, []):
+                        for ch in channels_by_band.get(band, ()):
                             if not self._running:
                                 return
                             if ch not in active_set:
-                                self._set_channel(ch)
-                                time.sleep(base_dwell)
+                                set_ch(ch)
+                                sleep(base_dwell)
 
                     # Periodic scan of idle channels in other bands
                     now = time.time()
                     if (now - last_idle_scan) >= self.idle_scan_interval_s:
-                        for ch in self.all_channels:
+                        for ch in all_channels:
                             if not self._running:
                                 return
-                            if ch not in active_set and self.channel_band.get(ch) not in active_bands:
-                                self._set_channel(ch)
-                                time.sleep(base_dwell)
+                            if ch not in active_set and channel_band.get(ch) not in active_bands:
+                                set_ch(ch)
+                                sleep(base_dwell)
                         last_idle_scan = time.time()
             except Exception as e:
                 logger.error(f"Channel hopper error (band_priority): {e}", exc_info=True)
@@ -494,8 +708,7 @@ class ChannelHopper:
 
     @property
     def current_channel(self) -> int:
-        with self._lock:
-            return self._current_channel
+        return self._current_channel
 
     @property
     def mode(self) -> str:
@@ -503,15 +716,12 @@ class ChannelHopper:
 
     @property
     def stats(self) -> dict:
-        now = time.time()
-        cutoff = now - self.activity_timeout_s
-        with self._lock:
-            s = dict(self._stats)
-            s["current_channel"] = self._current_channel
-            s["active_channels"] = sum(
-                1 for t in self._channel_activity.values() if t > cutoff
-            )
-            s["mode"] = self._mode
+        cutoff = time.monotonic() - self.activity_timeout_s
+        s = dict(self._stats)
+        s["current_channel"] = self._current_channel
+        activity = self._channel_activity
+        s["active_channels"] = sum(1 for ch in list(self._touched) if activity[ch] > cutoff)
+        s["mode"] = self._mode
         return s
 
 
@@ -534,6 +744,9 @@ class TsharkCapture:
         -j: Protocol layers to include in output
         -n: No DNS resolution (major speedup)
         -l: Line-buffered stdout (real-time output)
+
+    stdout is consumed as raw bytes and never decoded: on_line receives each
+    NDJSON line as bytes, which classify_frame hands straight to orjson.
     """
 
     # BPF capture filter: runs in kernel, drops non-management frames before
@@ -547,23 +760,60 @@ class TsharkCapture:
     # No -j flag: tshark 4.0.x EK mode breaks field expansion with -j
     DEFAULT_PROTOCOLS = None
 
+    # Snapshot length (-s).  0 = tshark default (whole frame).  A snaplen
+    # cuts capture copy and dissection work on long management frames, but
+    # anything past it (often the vendor IEs carrying RemoteID) is lost.
+    DEFAULT_SNAPLEN = 0
+
+    # Kernel capture buffer (-B, MiB).  dumpcap's 2 MiB default overflows
+    # during management-frame bursts while tshark is busy dissecting; a
+    # bigger ring means fewer drops and fewer wake-ups per frame batch.
+    DEFAULT_BUFFER_MB = 16
+
+    # tshark stdout pipe capacity.  The 64 KiB kernel default holds only a
+    # handful of EK lines; a larger pipe absorbs bursts while the reader is
+    # descheduled instead of blocking tshark (which then drops packets).
+    # Capped by /proc/sys/fs/pipe-max-size (1 MiB default) unless root.
+    PIPE_SIZE = 1 << 20
+
+    # Grace period for tshark to exit on SIGINT before the group is killed.
+    # Output is a pipe, not a file, so there is nothing worth waiting for.
+    STOP_TIMEOUT_S = 1.0
+
+    # Bytes requested per os.read() on tshark stdout.  A quarter of the pipe:
+    # a backlogged pipe drains in 4 reads instead of 16, while each chunk
+    # (and its split list) stays small enough to be cache-friendly — 1 MiB
+    # reads measured no faster than 64 KiB ones.
+    READ_SIZE = 1 << 18
+
     def __init__(
         self,
         interface: str,
         tshark_path: str = "/usr/bin/tshark",
-        on_line: Callable[[str], None] = None,
+        on_line: Callable[[bytes], None] = None,
         display_filter: str = None,
         capture_filter: str = None,
         protocols: str = None,
+        wakeup_fd: Optional[int] = None,
+        snaplen: int = None,
+        buffer_mb: int = None,
+        cpu: Optional[int] = None,
+        stderr_path: Optional[str] = None,
     ):
         """
         Args:
             interface: WiFi interface name (e.g., "wlan1mon")
             tshark_path: Path to tshark binary
-            on_line: Callback for each NDJSON line from stdout
+            on_line: Callback for each NDJSON line (raw bytes) from stdout
             display_filter: Wireshark display filter (-Y)
             capture_filter: BPF capture filter (-f), runs in kernel
             protocols: Comma-separated list of protocols to include in EK output
+            wakeup_fd: Read end of a signal.set_wakeup_fd() pipe; read_lines()
+                wakes on it and returns once request_stop() has been called
+            snaplen: Capture snapshot length in bytes (-s); 0 = whole frame
+            buffer_mb: Kernel capture buffer in MiB (-B); 0 = dumpcap default
+            cpu: Optional CPU to pin tshark (and its dumpcap child) to, via taskset
+            stderr_path: File to append tshark stderr to; None = inherit ours
         """
         self.interface = interface
         self.tshark_path = tshark_path
@@ -571,18 +821,24 @@ class TsharkCapture:
         self.display_filter = display_filter if display_filter is not None else self.DEFAULT_FILTER
         self.capture_filter = capture_filter or self.DEFAULT_CAPTURE_FILTER
         self.protocols = protocols or self.DEFAULT_PROTOCOLS
+        self.wakeup_fd = wakeup_fd
+        self.snaplen = snaplen if snaplen is not None else self.DEFAULT_SNAPLEN
+        self.buffer_mb = buffer_mb if buffer_mb is not None else self.DEFAULT_BUFFER_MB
+        self.cpu = cpu
+        self.stderr_path = stderr_path
 
         self._process: Optional[subprocess.Popen] = None
         self._running = False
-        self._stderr_thread: Optional[threading.Thread] = None
         self._stats_lock = threading.Lock()  # Protects _stats
 
         self._stats = {
             "lines_read": 0,
-            "start_time": 0.0,
-            "last_line_time": 0.0,
+            "start_time": 0.0,  # time.monotonic(); stats converts to wall clock
+            "last_line_time": 0.0,  # time.monotonic(); stats converts to wall clock
             "restarts": 0,
         }
+        # time.monotonic() of the stdout chunk read_lines() is yielding from
+        self.chunk_time = 0.0
 
     def build_command(self) -> list:
         """Build the tshark command line."""
@@ -593,12 +849,30 @@ class TsharkCapture:
             "-n",
             "-l",
         ]
+        if self.snaplen:
+            cmd.extend(["-s", str(self.snaplen)])
+        if self.buffer_mb:
+            cmd.extend(["-B", str(self.buffer_mb)])
         if self.capture_filter:
             cmd.extend(["-f", self.capture_filter])
         if self.display_filter:
             cmd.extend(["-Y", self.display_filter])
         if self.protocols:
             cmd.extend(["-j", self.protocols])
+        if self.cpu is not None:
+            # taskset execs tshark in place (same PID), and dumpcap inherits
+            # the mask — keeps dissection off the frame worker's core
+            taskset = _which("taskset")
+            if taskset:
+                cmd = [taskset, "-c", str(self.cpu)] + cmd
+            else:
+                logger.warning(f"taskset not found, not pinning tshark to CPU {self.cpu}")
+        setpriv = _which("setpriv")
+        if setpriv:
+            # PR_SET_PDEATHSIG: tshark gets SIGTERM if the thread that
+            # started it dies (i.e. we crash or are SIGKILLed) — no orphan
+            # holding the monitor interface.  setpriv also execs in place.
+            cmd = [setpriv, "--pdeathsig", "TERM", "--"] + cmd
         return cmd
 
     def start(self):
@@ -606,15 +880,27 @@ class TsharkCapture:
         cmd = self.build_command()
         logger.info(f"Starting tshark: {' '.join(cmd)}")
 
+        # tshark's stderr is a few status lines per run ("Capturing on ...",
+        # "N packets captured", errors).  Hand it an fd so the kernel writes
+        # it (to journald under systemd) instead of a Python reader thread.
+        stderr_fd = None
+        if self.stderr_path:
+            try:
+                stderr_fd = os.open(self.stderr_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o640)
+            except OSError as e:
+                logger.warning(f"Cannot open tshark stderr log {self.stderr_path}: {e}")
+
         try:
             self._process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                bufsize=1,  # Line-buffered
-                text=True,
-                encoding='utf-8',
-                errors='replace',
+                stderr=stderr_fd,
+                # Own process group: stop() signals tshark and its dumpcap
+                # child together, and terminal Ctrl-C reaches only us.
+                start_new_session=True,
+                # Binary pipe: lines are handed to the parser as bytes,
+                # skipping a full UTF-8 decode per frame.  read_lines() reads
+                # stdout's fd directly, so its BufferedReader is never filled.
             )
         except FileNotFoundError:
             logger.error(f"tshark not found at {self.tshark_path}")
@@ -622,20 +908,16 @@ class TsharkCapture:
         except PermissionError:
             logger.error(f"Permission denied running tshark. Need sudo/capabilities?")
             raise
+        finally:
+            if stderr_fd is not None:
+                os.close(stderr_fd)  # the child holds its own copy
 
         try:
+            self._grow_pipe(self._process.stdout)
             self._running = True
-            self._stats["start_time"] = time.time()
+            self._stats["start_time"] = time.monotonic()
             self._stats["restarts"] += 1
 
-            # Start stderr reader thread
-            self._stderr_thread = threading.Thread(
-                target=self._read_stderr,
-                daemon=True,
-                name="tshark-stderr"
-            )
-            self._stderr_thread.start()
-
             logger.info(f"tshark started, PID={self._process.pid}")
         except Exception:
             # Clean up the subprocess if post-creation setup fails
@@ -648,36 +930,97 @@ class TsharkCapture:
             self._running = False
             raise
 
+    def _grow_pipe(self, pipe):
+        """Enlarge a pipe's kernel buffer to PIPE_SIZE (best effort, Linux only)."""
+        setpipe_sz = getattr(fcntl, "F_SETPIPE_SZ", 1031)  # 1031 on Linux
+        try:
+            size = fcntl.fcntl(pipe.fileno(), setpipe_sz, self.PIPE_SIZE)
+            logger.debug(f"tshark stdout pipe size: {size} bytes")
+        except OSError as e:
+            logger.debug(f"Could not enlarge tshark stdout pipe: {e}")
+
     def read_lines(self):
         """
-        Generator: yields NDJSON lines from tshark stdout.
-        Blocks on readline, yields each line as it arrives.
-        Exits when process terminates or stop() is called.
+        Generator: yields NDJSON lines (bytes) from tshark stdout.
+        Waits on stdout (and the wakeup fd, if set) with a selector, reads
+        whatever is available and yields each complete line.
+        Exits when process terminates or stop()/request_stop() is called.
         """
         if not self._process or not self._process.stdout:
             return
 
+        fd = self._process.stdout.fileno()
+        wakeup_fd = self.wakeup_fd
+        read = os.read
+        read_size = self.READ_SIZE
+        stats = self._stats
+        on_line = self.on_line
+        monotonic = time.monotonic
+        sel = selectors.DefaultSelector()
+        sel.register(fd, selectors.EVENT_READ)
+        if wakeup_fd is not None:
+            sel.register(wakeup_fd, selectors.EVENT_READ)
+
+        partial = b""
         try:
-            for line in self._process.stdout:
-                if not self._running:
-                    break
-                line = line.strip()
-                if not line:
-                    continue
-
-                # GIL-safe integer/float assignment — no lock needed on hot path
-                self._stats["lines_read"] += 1
-                self._stats["last_line_time"] = time.time()
+            while self._running:
+                for key, _ in sel.select():
+                    if key.fd == wakeup_fd:
+                        self._drain_wakeup()
+                        continue
+
+                    chunk = read(fd, read_size)
+                    if not chunk:
+                        return  # EOF: tshark exited
+                    # One C-level split per chunk; only the short tail carried
+                    # over from the previous read is copied again.
+                    lines = chunk.split(b"\n")
+                    if partial:
+                        lines[0] = partial + lines[0]
+                    partial = lines.pop()  # incomplete tail (b"" after a newline)
+                    if not lines:
+                        continue
+
+                    # Stats once per chunk, not per line (GIL-safe, no lock)
+                    stats["lines_read"] += len(lines)
+                    now = monotonic()
+                    stats["last_line_time"] = now
+                    self.chunk_time = now
+
+                    for line in lines:
+                        if not self._running:
+                            return
+                        if not line or line.isspace():
+                            stats["lines_read"] -= 1  # rare: tshark emits no blank lines
+                            continue
 
-                # Call the callback if set
-                if self.on_line:
-                    self.on_line(line)
+                        if on_line:
+                            on_line(line)
 
-                yield line
+                        yield line
 
         except Exception as e:
             if self._running:
                 logger.error(f"Error reading tshark stdout: {e}")
+        finally:
+            sel.close()
+
+    def _drain_wakeup(self):
+        """Empty the (non-blocking) wakeup pipe so select() stops reporting it."""
+        try:
+            while os.read(self.wakeup_fd, 512):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def request_stop(self):
+        """Ask read_lines() to return without touching the subprocess.
+
+        Safe to call from a signal handler: it only clears a flag, and the
+        wakeup fd makes a blocked read_lines() notice it immediately.
+        stop() still has to be called afterwards to reap tshark.
+        """
+        self._running = False
 
     def run_blocking(self):
         """
@@ -694,47 +1037,35 @@ class TsharkCapture:
                 logger.error(f"tshark exited with code {rc}")
 
     def stop(self):
-        """Stop the tshark subprocess and join stderr thread."""
+        """Stop the tshark subprocess."""
         self._running = False
         if self._process:
             logger.info(f"Stopping tshark PID={self._process.pid}")
             try:
                 # Use SIGINT (not SIGTERM) — tshark handles SIGINT for graceful
                 # capture shutdown (flushes buffers, closes pcap cleanly).
-                self._process.send_signal(signal.SIGINT)
+                # Signal the whole group so dumpcap goes down with it.
+                self._signal_group(signal.SIGINT)
                 try:
-                    self._process.wait(timeout=5)
+                    self._process.wait(timeout=self.STOP_TIMEOUT_S)
                 except subprocess.TimeoutExpired:
                     logger.warning("tshark did not stop on SIGINT, killing")
-                    self._process.kill()
+                    self._signal_group(signal.SIGKILL)
                     self._process.wait(timeout=2)
+                # Reap anything left in the group (a dumpcap that outlived tshark)
+                self._signal_group(signal.SIGKILL)
             except Exception as e:
                 logger.error(f"Error stopping tshark: {e}")
             self._process = None
 
-        # Join stderr reader thread
-        if self._stderr_thread and self._stderr_thread.is_alive():
-            self._stderr_thread.join(timeout=3)
-            self._stderr_thread = None
-
-    def _read_stderr(self):
-        """Read tshark stderr in background thread for logging."""
-        if not self._process or not self._process.stderr:
-            return
+    def _signal_group(self, sig: int):
+        """Send sig to tshark's process group (falls back to tshark alone)."""
         try:
-            for line in self._process.stderr:
-                line = line.strip()
-                if not line:
-                    continue
-                # tshark prints useful info to stderr
-                if "Capturing on" in line:
-                    logger.info(f"tshark: {line}")
-                elif "packets captured" in line or "packets received" in line:
-                    logger.info(f"tshark: {line}")
-                else:
-                    logger.debug(f"tshark stderr: {line}")
-        except Exception:
-            pass  # Expected when process is killed
+            os.killpg(self._process.pid, sig)
+        except ProcessLookupError:
+            pass  # already gone
+        except OSError:
+            self._process.send_signal(sig)
 
     @property
     def is_running(self) -> bool:
@@ -761,11 +1092,16 @@ class TsharkCapture:
     def seconds_since_last_line(self) -> float:
         """Seconds since last NDJSON line was read."""
         if self._stats["last_line_time"] == 0:
-            return time.time() - self._stats["start_time"]
-        return time.time() - self._stats["last_line_time"]
+            return time.monotonic() - self._stats["start_time"]
+        return time.monotonic() - self._stats["last_line_time"]
 
     @property
     def stats(self) -> dict:
-        """Capture statistics. Thread-safe."""
+        """Capture statistics (timestamps as wall-clock epoch). Thread-safe."""
         with self._stats_lock:
-            return dict(self._stats)
+            s = dict(self._stats)
+        offset = time.time() - time.monotonic()
+        for key in ("start_time", "last_line_time"):
+            if s[key]:
+                s[key] += offset
+        return s
@@ -7,14 +7,33 @@ cap disk usage.
 
 dumpcap runs independently of tshark — both read from the same monitor
 mode interface (the kernel delivers copies to each reader).
+
+With use_tmpfs the ring is expected to live on a RAM-backed mount, so
+in-process consumers can mmap current_file() read-only to correlate
+detections with recent raw frames without touching the SD card.
+
+TpacketPcapRecorder is an in-process alternative: an AF_PACKET TPACKET_V3
+mmap ring whose completed blocks are written straight to the same
+capture_NNNNN_*.pcapng ring with one writev per block — no dumpcap
+process, no per-frame syscall and no user-space copy of frame data.
 """
 
 import logging
+import mmap
+import os
+import select
 import shutil
+import socket
+import struct
 import subprocess
+import threading
+import time
 from pathlib import Path
 from typing import Optional
 
+# Filesystems whose pages live in RAM (mmap of the active file never hits disk)
+_RAM_FS_TYPES = ("tmpfs", "ramfs")
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,15 +46,22 @@ class PcapRecorder:
         pcap_path: str = "/var/lib/nozyme/pcap",
         filesize_kb: int = 10240,
         num_files: int = 10,
+        use_tmpfs: bool = False,
     ):
         self.interface = interface
         self.pcap_path = Path(pcap_path)
         self.filesize_kb = filesize_kb
         self.num_files = num_files
+        self.use_tmpfs = use_tmpfs
         self._proc: Optional[subprocess.Popen] = None
 
     def start(self):
-        """Start the dumpcap ring buffer capture."""
+        """Start the dumpcap ring buffer capture.
+
+        The Popen call must keep CPython's vfork fast path: no preexec_fn
+        (and no user/group switching).  With a fork() the spawn cost grows
+        with the tap's RSS (~45 ms at 2 GB vs ~1 ms with vfork).
+        """
         dumpcap = shutil.which("dumpcap")
         if not dumpcap:
             logger.error("dumpcap not found in PATH — PCAP recording disabled")
@@ -44,6 +70,8 @@ class PcapRecorder:
         self.pcap_path.mkdir(parents=True, exist_ok=True)
         outfile = self.pcap_path / "capture.pcapng"
 
+        self._check_tmpfs()
+
         cmd = [
             dumpcap,
             "-i", self.interface,
@@ -73,17 +101,320 @@ class PcapRecorder:
             return
         try:
             self._proc.terminate()
-            self._proc.wait(timeout=5)
+            _wait_exit(self._proc, 5)
             logger.info("PCAP recorder stopped")
         except subprocess.TimeoutExpired:
             self._proc.kill()
-            self._proc.wait(timeout=2)
+            _wait_exit(self._proc, 2)
             logger.warning("PCAP recorder killed (did not stop gracefully)")
         except Exception as e:
             logger.debug("Error stopping PCAP recorder: %s", e)
         finally:
             self._proc = None
 
+    def _check_tmpfs(self):
+        """Warn if use_tmpfs is set but pcap_path is not RAM-backed."""
+        if not self.use_tmpfs:
+            return
+        fstype = _mount_fstype(self.pcap_path)
+        if fstype not in _RAM_FS_TYPES:
+            logger.warning(
+                "pcap_use_tmpfs set but %s is on %s, not tmpfs — "
+                "ring writes and mmap reads will hit the disk",
+                self.pcap_path, fstype or "an unknown filesystem",
+            )
+
     @property
     def is_running(self) -> bool:
         return self._proc is not None and self._proc.poll() is None
+
+    @property
+    def current_file(self) -> Optional[Path]:
+        """The ring file dumpcap is currently writing, or None.
+
+        dumpcap names ring files capture_NNNNN_YYYYmmddHHMMSS.pcapng with an
+        increasing sequence number, so the newest is the last one by name.
+        """
+        try:
+            files = sorted(self.pcap_path.glob("capture_*.pcapng"))
+        except OSError:
+            return None
+        return files[-1] if files else None
+
+
+def _wait_exit(proc: subprocess.Popen, timeout: float):
+    """Popen.wait(timeout) without the sleep-poll loop.
+
+    Blocks in poll() on a pidfd so the kernel wakes us the moment the
+    child exits, then reaps it.  Falls back to Popen.wait on kernels
+    before 5.3 / Python before 3.9.  Raises subprocess.TimeoutExpired.
+    """
+    try:
+        pidfd = os.pidfd_open(proc.pid)
+    except (AttributeError, OSError):
+        # No pidfd support, or the child is already reaped
+        proc.wait(timeout=timeout)
+        return
+    try:
+        poller = select.poll()
+        poller.register(pidfd, select.POLLIN)
+        if not poller.poll(timeout * 1000):
+            raise subprocess.TimeoutExpired(proc.args, timeout)
+    finally:
+        os.close(pidfd)
+    proc.wait()
+
+
+def _mount_fstype(path: Path) -> Optional[str]:
+    """Filesystem type of the mount containing path (from /proc/mounts)."""
+    try:
+        target = str(path.resolve())
+        best, fstype = "", None
+        with open("/proc/mounts") as f:
+            for entry in f:
+                fields = entry.split()
+                if len(fields) < 3:
+                    continue
+                mnt = fields[1].replace("\\040", " ")
+                if (target == mnt or target.startswith(mnt.rstrip("/") + "/")) \
+                        and len(mnt) > len(best):
+                    best, fstype = mnt, fields[2]
+        return fstype
+    except OSError:
+        return None
+
+
+# ── In-process TPACKET_V3 recorder ──────────────────────────────────
+
+# <linux/if_packet.h>
+SOL_PACKET = 263
+PACKET_RX_RING = 5
+PACKET_VERSION = 10
+TPACKET_V3 = 2
+TP_STATUS_KERNEL = 0
+TP_STATUS_USER = 1
+ETH_P_ALL = 0x0003
+
+# struct tpacket_req3
+_TPACKET_REQ3 = struct.Struct("7I")
+# struct tpacket_block_desc: version, offset_to_priv, then tpacket_hdr_v1
+# (block_status, num_pkts, offset_to_first_pkt, ...)
+_BLOCK_STATUS_OFFSET = 8
+_BLOCK_HDR = struct.Struct("III")
+# struct tpacket3_hdr: tp_next_offset, tp_sec, tp_nsec, tp_snaplen, tp_len,
+# tp_status, tp_mac, tp_net
+_TP3_HDR = struct.Struct("IIIIIIHH")
+
+# ARPHRD_* (/sys/class/net/<iface>/type) -> pcapng LINKTYPE_*
+_LINKTYPES = {
+    1: 1,       # ARPHRD_ETHER -> LINKTYPE_ETHERNET
+    801: 105,   # ARPHRD_IEEE80211 -> LINKTYPE_IEEE802_11
+    803: 127,   # ARPHRD_IEEE80211_RADIOTAP -> LINKTYPE_IEEE802_11_RADIOTAP
+}
+
+# pcapng blocks (native byte order; the SHB magic tells readers which)
+_EPB_HDR = struct.Struct("IIIIIII")  # type, len, if_id, ts_hi, ts_lo, caplen, origlen
+_EPB_TYPE = 0x00000006
+_EPB_TAILS = tuple(b"\0" * pad for pad in range(4))
+_U32 = struct.Struct("I")
+
+# writev() accepts at most IOV_MAX (1024 on Linux) buffers per call
+_IOV_MAX = 1023
+
+
+def _pcapng_header(linktype: int) -> bytes:
+    """Section Header Block + one Interface Description Block (ns timestamps)."""
+    shb = struct.pack("IIIHHq", 0x0A0D0D0A, 28, 0x1A2B3C4D, 1, 0, -1) + _U32.pack(28)
+    # if_tsresol (9) = 10^-9, padded to 4 bytes, then opt_endofopt
+    opts = struct.pack("HHB3x", 9, 1, 9) + struct.pack("HH", 0, 0)
+    idb_len = 20 + len(opts)
+    idb = struct.pack("IIHHI", 0x00000001, idb_len, linktype, 0, 0) + opts + _U32.pack(idb_len)
+    return shb + idb
+
+
+class TpacketPcapRecorder(PcapRecorder):
+    """In-process PCAP ring recorder on an AF_PACKET TPACKET_V3 mmap ring.
+
+    Same constructor, ring layout and current_file as PcapRecorder.  A
+    writer thread sleeps in poll() until the kernel retires a block, then
+    writes its frames as pcapng EPBs straight out of the mmap.  The thread
+    spends a few struct calls per frame under the GIL, so on a busy tap it
+    competes with the frame worker — dumpcap (a separate process) stays the
+    default backend.
+    """
+
+    # Ring geometry: 8 x 1 MiB blocks.  A block is handed to us when full or
+    # after BLOCK_TIMEOUT_MS, whichever comes first.  Files rotate on block
+    # boundaries, so one may overshoot filesize_kb by up to BLOCK_SIZE.
+    BLOCK_SIZE = 1 << 20
+    BLOCK_NR = 8
+    FRAME_SIZE = 2048
+    BLOCK_TIMEOUT_MS = 100
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sock: Optional[socket.socket] = None
+        self._ring: Optional[mmap.mmap] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._fd = -1
+        self._file_bytes = 0
+        self._file_seq = 0
+        self._header = b""
+
+    def start(self):
+        """Open the TPACKET_V3 ring and start the writer thread.
+
+        Failures (no CAP_NET_RAW, kernel without TPACKET_V3, unknown link
+        type) are logged and leave is_running False so the caller can fall
+        back to dumpcap.
+        """
+        self.pcap_path.mkdir(parents=True, exist_ok=True)
+        self._check_tmpfs()
+
+        try:
+            arphrd = int(Path(f"/sys/class/net/{self.interface}/type").read_text())
+            linktype = _LINKTYPES[arphrd]
+        except (OSError, ValueError, KeyError) as e:
+            logger.error("TPACKET recorder: unsupported link type on %s: %s",
+                         self.interface, e)
+            return
+        self._header = _pcapng_header(linktype)
+        self._file_seq = _last_ring_seq(self.pcap_path)
+
+        sock = None
+        try:
+            sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+            sock.setsockopt(SOL_PACKET, PACKET_VERSION, TPACKET_V3)
+            req = _TPACKET_REQ3.pack(
+                self.BLOCK_SIZE, self.BLOCK_NR, self.FRAME_SIZE,
+                self.BLOCK_SIZE * self.BLOCK_NR // self.FRAME_SIZE,
+                self.BLOCK_TIMEOUT_MS, 0, 0,
+            )
+            sock.setsockopt(SOL_PACKET, PACKET_RX_RING, req)
+            ring = mmap.mmap(sock.fileno(), self.BLOCK_SIZE * self.BLOCK_NR,
+                             mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+            sock.bind((self.interface, ETH_P_ALL))
+        except (OSError, AttributeError) as e:
+            logger.error("TPACKET recorder failed to open ring on %s: %s",
+                         self.interface, e)
+            if sock is not None:
+                sock.close()
+            return
+
+        self._sock = sock
+        self._ring = ring
+        self._open_next_file()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True, name="pcap-ring")
+        self._thread.start()
+        logger.info(
+            "PCAP recorder started (TPACKET_V3, %d x %d KiB ring): %s (ring: %d x %dKB)",
+            self.BLOCK_NR, self.BLOCK_SIZE >> 10, self.pcap_path,
+            self.num_files, self.filesize_kb,
+        )
+
+    def stop(self):
+        """Stop the writer thread and release the ring and output file."""
+        if self._thread is None:
+            return
+        self._running = False
+        self._thread.join(timeout=2)
+        self._thread = None
+        try:
+            self._ring.close()
+        except (BufferError, ValueError) as e:
+            logger.debug("Error closing TPACKET ring: %s", e)
+        self._sock.close()
+        self._ring = None
+        self._sock = None
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        logger.info("PCAP recorder stopped")
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        """Writer loop: wait for the kernel to retire a block, write it, hand it back."""
+        ring = self._ring
+        view = memoryview(ring)
+        block_size = self.BLOCK_SIZE
+        block_nr = self.BLOCK_NR
+        limit = self.filesize_kb * 1024
+        poller = select.poll()
+        poller.register(self._sock.fileno(), select.POLLIN | select.POLLERR)
+        block = 0
+        try:
+            while self._running:
+                off = block * block_size
+                status, num_pkts, first = _BLOCK_HDR.unpack_from(ring, off + _BLOCK_STATUS_OFFSET)
+                if not status & TP_STATUS_USER:
+                    poller.poll(200)
+                    continue
+                try:
+                    self._write_block(view, off + first, num_pkts)
+                except OSError as e:
+                    logger.error("PCAP write failed: %s", e)
+                _U32.pack_into(ring, off + _BLOCK_STATUS_OFFSET, TP_STATUS_KERNEL)
+                block = (block + 1) % block_nr
+                if self._file_bytes >= limit:
+                    self._open_next_file()
+        except Exception as e:
+            logger.error("PCAP ring writer error: %s", e, exc_info=True)
+        finally:
+            view.release()
+
+    def _write_block(self, view: memoryview, pkt: int, num_pkts: int):
+        """Write one retired block's frames as EPBs (frame data stays in the ring)."""
+        bufs = []
+        append = bufs.append
+        unpack_hdr = _TP3_HDR.unpack_from
+        pack_epb = _EPB_HDR.pack
+        pack_u32 = _U32.pack
+        written = 0
+        for _ in range(num_pkts):
+            next_off, sec, nsec, snaplen, wirelen, _, mac, _ = unpack_hdr(view, pkt)
+            ts = sec * 1_000_000_000 + nsec
+            pad = -snaplen & 3
+            blen = 32 + snaplen + pad
+            append(pack_epb(_EPB_TYPE, blen, 0, ts >> 32, ts & 0xFFFFFFFF, snaplen, wirelen))
+            append(view[pkt + mac:pkt + mac + snaplen])
+            append(_EPB_TAILS[pad] + pack_u32(blen))
+            written += blen
+            pkt += next_off
+        fd = self._fd
+        for i in range(0, len(bufs), _IOV_MAX):
+            os.writev(fd, bufs[i:i + _IOV_MAX])
+        self._file_bytes += written
+
+    def _open_next_file(self):
+        """Rotate to a new ring file (dumpcap naming) and drop the oldest beyond num_files."""
+        if self._fd >= 0:
+            os.close(self._fd)
+        self._file_seq += 1
+        name = f"capture_{self._file_seq:05d}_{time.strftime('%Y%m%d%H%M%S')}.pcapng"
+        self._fd = os.open(self.pcap_path / name,
+                           os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o640)
+        os.write(self._fd, self._header)
+        self._file_bytes = len(self._header)
+
+        files = sorted(self.pcap_path.glob("capture_*.pcapng"))
+        for old in files[:-self.num_files]:
+            try:
+                old.unlink()
+            except OSError as e:
+                logger.debug("Cannot remove old ring file %s: %s", old, e)
+
+
+def _last_ring_seq(pcap_path: Path) -> int:
+    """Highest NNNNN in existing capture_NNNNN_*.pcapng files (0 if none)."""
+    last = 0
+    for f in pcap_path.glob("capture_*.pcapng"):
+        try:
+            last = max(last, int(f.name.split("_")[1]))
+        except (IndexError, ValueError):
+            continue
+    return last
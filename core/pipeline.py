@@ -0,0 +1,138 @@
+"""
+nozyme-tap frame hand-off between the tshark reader and classification.
+
+The tshark reader thread only appends raw lines to a bounded queue; a
+worker thread pops them and runs classify → wifi_frame → ZMQ.  A slow
+ZMQ send or a classification burst therefore never stops the reader from
+draining tshark's stdout pipe (a full pipe makes tshark drop packets).
+
+On overflow the OLDEST line is dropped — fresh frames are worth more to
+the node than stale ones — and the drop is counted in stats.
+
+The worker sleeps on a condition variable while the queue is empty; the
+reader only takes the condition lock to wake it when it is actually
+asleep, so a busy queue costs one deque append per line and no polling.
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+from nozyme_tap.system.affinity import pin_current_thread
+
+logger = logging.getLogger(__name__)
+
+
+class FrameQueue:
+    """Bounded drop-oldest queue drained by a single worker thread."""
+
+    def __init__(
+        self,
+        handler: Callable[[bytes], None],
+        maxlen: int = 4096,
+        on_idle: Optional[Callable[[], None]] = None,
+        cpu: Optional[int] = None,
+    ):
+        """
+        Args:
+            handler: Called on the worker thread for each queued line
+            maxlen: Queue bound; oldest lines are dropped beyond this
+            on_idle: Called on the worker thread each time the queue has
+                been drained (e.g. to flush a batched transport)
+            cpu: Optional CPU to pin the worker thread to
+        """
+        self._handler = handler
+        self._on_idle = on_idle
+        self._cpu = cpu
+        self._queue: deque = deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+        self._waiting = False  # worker is parked in cond.wait()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        # Each key is written by one thread only (GIL-safe, no lock)
+        self._stats = {
+            "queued": 0,
+            "dropped": 0,
+            "processed": 0,
+            "errors": 0,
+        }
+
+    def put(self, line: bytes):
+        """Queue a line for the worker (called on the reader thread)."""
+        q = self._queue
+        if len(q) >= q.maxlen:
+            self._stats["dropped"] += 1
+        q.append(line)  # deque(maxlen) evicts the oldest entry itself
+        self._stats["queued"] += 1
+        # Append happens before this read, and the worker re-checks the queue
+        # after setting _waiting under the lock — no wakeup can be lost.
+        if self._waiting:
+            with self._cond:
+                self._cond.notify()
+
+    def start(self):
+        """Start the worker thread."""
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run,
+            daemon=True,
+            name="frame-worker"
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the worker thread (lines still queued are discarded)."""
+        self._running = False
+        with self._cond:
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=3)
+            self._thread = None
+
+    def _run(self):
+        """Worker loop: wait for lines, drain the queue, repeat."""
+        pin_current_thread(self._cpu, "frame-worker")
+        q = self._queue
+        popleft = q.popleft
+        handler = self._handler
+        cond = self._cond
+        stats = self._stats
+        on_idle = self._on_idle
+
+        while self._running:
+            if not q:
+                if on_idle:
+                    try:
+                        on_idle()
+                    except Exception as e:
+                        logger.error(f"Frame worker idle hook error: {e}")
+                with cond:
+                    self._waiting = True
+                    while not q and self._running:
+                        cond.wait()
+                    self._waiting = False
+                continue
+            while q:
+                try:
+                    line = popleft()
+                except IndexError:
+                    break
+                try:
+                    handler(line)
+                except Exception as e:
+                    stats["errors"] += 1
+                    logger.error(f"Frame worker error: {e}", exc_info=True)
+                stats["processed"] += 1
+
+    @property
+    def depth(self) -> int:
+        """Lines currently waiting for the worker."""
+        return len(self._queue)
+
+    @property
+    def stats(self) -> dict:
+        s = dict(self._stats)
+        s["depth"] = len(self._queue)
+        return s
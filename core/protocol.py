@@ -4,6 +4,7 @@ Message types, field names, and serialization helpers.
 Used by both nozyme_tap (sender) and CC node_receiver (receiver).
 """
 
+import time
 from datetime import datetime, timezone
 
 # Protocol version for compatibility checking
@@ -99,6 +100,14 @@ OP_STATUS_NAMES = {
     OP_STATUS_REMOTE_ID_FAILURE: "RemoteIDFailure",
 }
 
+# Tuple views of the name tables, indexed directly by code.  Every F3411 code
+# above is a 4-bit field, so TABLE[code & 0xF] is a plain tuple index with no
+# hashing or KeyError path; undefined codes map to the same fallback names
+# decoders use.  The dicts stay for .get() callers (the CC receiver).
+MESSAGE_TYPE_NAME_BY_CODE = tuple(MESSAGE_TYPE_NAMES.get(i) for i in range(16))
+UA_TYPE_NAME_BY_CODE = tuple(UA_TYPE_NAMES.get(i, "OTHER") for i in range(16))
+OP_STATUS_NAME_BY_CODE = tuple(OP_STATUS_NAMES.get(i, "UNKNOWN") for i in range(16))
+
 # Height types
 HEIGHT_ABOVE_TAKEOFF = 0
 HEIGHT_AGL = 1
@@ -109,9 +118,29 @@ OPERATOR_LOCATION_LIVE_GNSS = 1
 OPERATOR_LOCATION_FIXED = 2
 
 
+# utcnow_iso() cache: (time_ns bucket, ISO string).  One tuple so readers on
+# other threads (heartbeat) always see a matching pair without a lock.
+_ISO_RESOLUTION_NS = 1_000_000
+_iso_cache = (-1, "")
+
+
 def utcnow_iso() -> str:
-    """Return current UTC time as ISO 8601 string."""
-    return datetime.now(timezone.utc).isoformat()
+    """Return current UTC time as ISO 8601 string (1 ms resolution).
+
+    Frames emitted within the same millisecond share one formatted string;
+    isoformat() is only paid once per tick.
+    """
+    global _iso_cache
+    now = time.time_ns()
+    tick = now // _ISO_RESOLUTION_NS
+    cached_tick, iso = _iso_cache
+    if tick == cached_tick:
+        return iso
+    # Fixed width: isoformat() drops the fraction on whole seconds.
+    iso = datetime.fromtimestamp(tick / 1000, timezone.utc).isoformat(
+        timespec="microseconds")
+    _iso_cache = (tick, iso)
+    return iso
 
 
 def make_wifi_frame(
@@ -141,6 +170,77 @@ def make_wifi_frame(
     }
 
 
+# make_uav_report field defaults, in wire order.  Every report is a copy of
+# this template updated with the caller's kwargs; unknown kwargs are dropped.
+_UAV_TEMPLATE = {
+    "type": None,
+    "protocol_version": None,
+    "tap_uuid": None,
+    "timestamp": None,
+    "mac": None,
+    "identifier": None,
+    "detection_source": "RemoteIdWiFi",
+    # Position
+    "latitude": None,
+    "longitude": None,
+    "altitude_geodetic": None,
+    "altitude_pressure": None,
+    "height": None,
+    "height_type": None,
+    # Movement
+    "ground_track": None,
+    "speed": None,
+    "vertical_speed": None,
+    # Status
+    "uav_type": "OTHER",
+    "operational_status": None,
+    # Signal
+    "rssi": None,
+    # Identity
+    "id_serial": None,
+    "id_registration": None,
+    "id_utm": None,
+    "id_session": None,
+    # Operator
+    "operator_latitude": None,
+    "operator_longitude": None,
+    "operator_altitude": None,
+    "operator_id": None,
+    "operator_location_type": None,
+    # Accuracy
+    "accuracy_horizontal": None,
+    "accuracy_vertical": None,
+    "accuracy_barometer": None,
+    "accuracy_speed": None,
+    # Message tracking
+    "message_types_seen": None,  # fresh list per report
+    # Self-ID
+    "self_id_description": None,
+    "self_id_type": None,
+    # Auth
+    "auth_type": None,
+    "auth_data": None,
+    # EU classification
+    "category_eu": None,
+    "class_eu": None,
+    # Area
+    "area_count": None,
+    "area_radius": None,
+    "area_ceiling": None,
+    "area_floor": None,
+    # Spoof detection flags (set by spoof_detector)
+    "spoof_flags": None,  # fresh list per report
+    "trust_score": 100,
+    # Raw fields for JSONB storage (everything tshark gave us)
+    "raw_fields": None,
+    # Designation (set by enrichment)
+    "designation": None,
+    # WiFi SSID (from beacon/probe fingerprinting)
+    "ssid": None,
+}
+_UAV_FIELDS = frozenset(_UAV_TEMPLATE)
+
+
 def make_uav_report(
     tap_uuid: str,
     mac: str,
@@ -161,75 +261,33 @@ def make_uav_report(
     Returns:
         Dict ready for msgpack serialization
     """
-    report = {
-        "type": MSG_UAV_REPORT,
-        "protocol_version": PROTOCOL_VERSION,
-        "tap_uuid": tap_uuid,
-        "timestamp": utcnow_iso(),
-        "mac": mac,
-        "identifier": identifier,
-        "detection_source": kwargs.get("detection_source", "RemoteIdWiFi"),
-        # Position
-        "latitude": kwargs.get("latitude"),
-        "longitude": kwargs.get("longitude"),
-        "altitude_geodetic": kwargs.get("altitude_geodetic"),
-        "altitude_pressure": kwargs.get("altitude_pressure"),
-        "height": kwargs.get("height"),
-        "height_type": kwargs.get("height_type"),
-        # Movement
-        "ground_track": kwargs.get("ground_track"),
-        "speed": kwargs.get("speed"),
-        "vertical_speed": kwargs.get("vertical_speed"),
-        # Status
-        "uav_type": kwargs.get("uav_type", "OTHER"),
-        "operational_status": kwargs.get("operational_status"),
-        # Signal
-        "rssi": kwargs.get("rssi"),
-        # Identity
-        "id_serial": kwargs.get("id_serial"),
-        "id_registration": kwargs.get("id_registration"),
-        "id_utm": kwargs.get("id_utm"),
-        "id_session": kwargs.get("id_session"),
-        # Operator
-        "operator_latitude": kwargs.get("operator_latitude"),
-        "operator_longitude": kwargs.get("operator_longitude"),
-        "operator_altitude": kwargs.get("operator_altitude"),
-        "operator_id": kwargs.get("operator_id"),
-        "operator_location_type": kwargs.get("operator_location_type"),
-        # Accuracy
-        "accuracy_horizontal": kwargs.get("accuracy_horizontal"),
-        "accuracy_vertical": kwargs.get("accuracy_vertical"),
-        "accuracy_barometer": kwargs.get("accuracy_barometer"),
-        "accuracy_speed": kwargs.get("accuracy_speed"),
-        # Message tracking
-        "message_types_seen": kwargs.get("message_types_seen", []),
-        # Self-ID
-        "self_id_description": kwargs.get("self_id_description"),
-        "self_id_type": kwargs.get("self_id_type"),
-        # Auth
-        "auth_type": kwargs.get("auth_type"),
-        "auth_data": kwargs.get("auth_data"),
-        # EU classification
-        "category_eu": kwargs.get("category_eu"),
-        "class_eu": kwargs.get("class_eu"),
-        # Area
-        "area_count": kwargs.get("area_count"),
-        "area_radius": kwargs.get("area_radius"),
-        "area_ceiling": kwargs.get("area_ceiling"),
-        "area_floor": kwargs.get("area_floor"),
-        # Spoof detection flags (set by spoof_detector)
-        "spoof_flags": kwargs.get("spoof_flags", []),
-        "trust_score": kwargs.get("trust_score", 100),
-        # Raw fields for JSONB storage (everything tshark gave us)
-        "raw_fields": raw_fields or {},
-        # Designation (set by enrichment)
-        "designation": kwargs.get("designation"),
-        # WiFi SSID (from beacon/probe fingerprinting)
-        "ssid": kwargs.get("ssid"),
-    }
+    report = _UAV_TEMPLATE.copy()
+    if kwargs.keys() <= _UAV_FIELDS:
+        report.update(kwargs)
+    else:
+        report.update({k: v for k, v in kwargs.items() if k in _UAV_FIELDS})
+    report["type"] = MSG_UAV_REPORT
+    report["protocol_version"] = PROTOCOL_VERSION
+    report["tap_uuid"] = tap_uuid
+    report["timestamp"] = utcnow_iso()
+    report["mac"] = mac
+    report["identifier"] = identifier
+    report["raw_fields"] = raw_fields or {}
+    if "message_types_seen" not in kwargs:
+        report["message_types_seen"] = []
+    if "spoof_flags" not in kwargs:
+        report["spoof_flags"] = []
     return report
 
 
+# Heartbeat fields that stay constant for the life of the process.  The
+# transport packs these once and re-encodes only the remaining fields.
+HEARTBEAT_STATIC_FIELDS = (
+    "type", "protocol_version", "tap_uuid", "tap_name", "version",
+    "interface", "latitude", "longitude", "channels",
+)
+
+
 def make_heartbeat(
     tap_uuid: str,
     tap_name: str,
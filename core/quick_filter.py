@@ -16,7 +16,18 @@ to the node for full parsing.
 Performance: a raw-string pre-filter rejects ~99% of lines (normal WiFi
 beacons) WITHOUT JSON parsing.  Only lines containing a drone protocol
 keyword, a known OUI prefix, or a drone manufacturer SSID substring get
-parsed.
+parsed.  Lines arrive as raw bytes straight from the tshark pipe — the
+pre-filter scans bytes and orjson parses bytes, so no UTF-8 decode of
+the full line ever happens.
+
+Reject path, cheapest first — every step is a single call into C:
+  a. prefix / bounded '"layers"' probe (memcmp, memmem over 256 bytes)
+  b. protocol keywords (memmem)
+  c. trigger scan (Hyperscan > Aho-Corasick > bytes regex)
+  d. SSID/OUI checks on byte slices for tier-2-only hits
+Only lines that survive all four are handed to orjson, so per-line
+interpreter overhead is a handful of bytecodes; a compiled extension
+would only speed up the rare hit path.
 """
 
 import json
@@ -33,17 +44,45 @@ try:
 except ImportError:
     _loads = json.loads
 
+# Optional: Aho-Corasick automaton for the trigger pre-filter (one linear
+# pass for all ~250 triggers, >10x faster than the regex alternation on a
+# typical 2-3 KB EK line).  Falls back to the compiled regex.
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional: Hyperscan block-mode database (SIMD literal matching, ~50x
+# faster again than either of the above on the reject path).  x86 builds
+# of python-hyperscan; preferred over Aho-Corasick when importable.
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
 # ── Module-level state (loaded once) ────────────────────────────────
 
 _ssid_patterns = None     # List[(compiled_re, mfr, model, is_ctrl)]
-_oui_drone_set = None     # set of "XX:XX:XX" OUI strings
+_ssid_re = None           # WiFiFingerprint's union of all SSID patterns (Check 4)
+_oui_drone_set = None     # set of "xx:xx:xx" OUI strings (lowercase, colons)
 _raw_triggers = None      # frozenset of raw-string triggers for pre-filter
-_trigger_re = None        # compiled regex for single-pass pre-filter
+_trigger_re = None        # compiled bytes regex for single-pass pre-filter
+_trigger_search = None    # bytes -> truthy if any tier-2 trigger occurs
+_trigger_engine = "regex"
+
+# Tier-1 pre-filter: protocol-layer keywords (checks 1-3), tested with plain
+# `in` (C memmem) before the regex.  These three substrings cover every layer
+# name: "droneid" ⊂ "opendroneid", "drone_id" ⊂ "open_drone_id"/"dji_drone_id".
+_PROTO_TRIGGERS = (b"droneid", b"drone_id", b"remoteid")
+
+# EK layer names carrying OpenDroneID (checks 1-2): one isdisjoint() call
+_ODID_LAYERS = frozenset(("opendroneid", "open_drone_id", "droneid", "remoteid"))
 
 
 def _ensure_patterns():
     """Load patterns and build the raw-string trigger set on first call."""
-    global _ssid_patterns, _oui_drone_set, _raw_triggers, _trigger_re
+    global _ssid_patterns, _oui_drone_set, _raw_triggers, _trigger_re, _ssid_re
+    global _trigger_search, _trigger_engine
     if _raw_triggers is not None:
         return
 
@@ -51,7 +90,12 @@ def _ensure_patterns():
         from nozyme_tap.intel.wifi_fingerprint import WiFiFingerprint
         fp = WiFiFingerprint()
         _ssid_patterns = fp._ssid_patterns
-        _oui_drone_set = fp._oui_drone_set
+        _ssid_re = fp._ssid_union
+        # tshark prints MACs lowercase with colons; normalize the set to
+        # match so Check 5 only slices the MAC prefix.
+        _oui_drone_set = {
+            o.lower().replace("-", ":") for o in fp._oui_drone_set
+        }
     except Exception as e:
         logger.error("Failed to load WiFi fingerprint patterns: %s", e)
         _ssid_patterns = []
@@ -71,8 +115,7 @@ def _ensure_patterns():
 
     # Drone OUI prefixes in lowercase — they appear in MAC address strings
     # inside the JSON, e.g. "60:60:1f:aa:bb:cc"
-    for oui in (_oui_drone_set or set()):
-        triggers.add(oui.lower())
+    triggers.update(_oui_drone_set)
 
     # SSID manufacturer keywords — extract unique short substrings that
     # appear in drone SSIDs but rarely in normal WiFi.  These are the
@@ -150,82 +193,282 @@ def _ensure_patterns():
     _raw_triggers = frozenset(triggers)
 
     # Compile a single regex for single-pass pre-filtering (much faster than
-    # iterating all triggers with `in` substring checks).
-    escaped = [re.escape(t) for t in sorted(triggers, key=len, reverse=True)]
-    _trigger_re = re.compile("|".join(escaped))
+    # iterating all triggers with `in` substring checks).  Compiled as a
+    # bytes pattern so it runs directly on the undecoded tshark line.
+    # Triggers already covered by the tier-1 keyword check are left out.
+    regex_triggers = [
+        t.encode() for t in triggers
+        if not any(p in t.encode() for p in _PROTO_TRIGGERS)
+    ]
+    escaped = [re.escape(t) for t in sorted(regex_triggers, key=len, reverse=True)]
+    _trigger_re = re.compile(b"|".join(escaped))
+    _trigger_search = _trigger_re.search
+    _trigger_engine = "regex"
+
+    if hyperscan is not None:
+        try:
+            _trigger_search = _build_hyperscan_search(regex_triggers)
+            _trigger_engine = "hyperscan"
+        except Exception as e:
+            logger.warning(f"Hyperscan compile failed, falling back: {e}")
+
+    if ahocorasick is not None and _trigger_engine == "regex":
+        # pyahocorasick matches str: triggers and lines both go through
+        # latin-1, a 1:1 byte -> code point map, so matches are identical
+        # to the bytes regex (triggers are ASCII).
+        automaton = ahocorasick.Automaton()
+        for t in regex_triggers:
+            automaton.add_word(t.decode("latin-1"), None)
+        automaton.make_automaton()
+        _ac_iter = automaton.iter
+
+        def _trigger_search(line: bytes) -> bool:
+            return next(_ac_iter(line.decode("latin-1")), None) is not None
+
+        _trigger_engine = "aho-corasick"
 
     logger.info(
         "Quick filter loaded: %d SSID patterns, %d drone OUIs, "
-        "%d raw triggers",
+        "%d raw triggers (%s, %s)",
         len(_ssid_patterns), len(_oui_drone_set), len(_raw_triggers),
+        _trigger_engine, "orjson" if _loads is not json.loads else "stdlib json",
+    )
+    if _loads is json.loads:
+        logger.warning("orjson not installed: pre-filter hits parse with stdlib json "
+                       "(several times slower; pip install orjson)")
+
+
+def _build_hyperscan_search(triggers):
+    """Compile triggers into a Hyperscan block database; return a bytes -> bool search.
+
+    The match callback returns True to stop at the first hit, which the
+    binding surfaces as ScanTerminated.  One scratch space is shared: the
+    pre-filter only ever runs on the frame-worker thread.
+    """
+    db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    db.compile(
+        expressions=[re.escape(t) for t in triggers],
+        ids=list(range(len(triggers))),
+        flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(triggers),
     )
+    scan = db.scan
+    scratch = hyperscan.Scratch(db)
+    terminated = hyperscan.ScanTerminated
+
+    def _stop(*_):
+        return True
+
+    def _search(line: bytes) -> bool:
+        try:
+            scan(line, match_event_handler=_stop, scratch=scratch)
+        except terminated:
+            return True
+        return False
+
+    return _search
+
+
+def preload_patterns():
+    """Load patterns and compile the pre-filter now instead of on the first frame.
+
+    Loading drone_models.json and compiling the Hyperscan/AC/regex engines
+    takes long enough to back up the frame queue if it happens on the hot
+    path; call this at startup before capture begins.
+    """
+    _ensure_patterns()
 
 
 # ── Helpers for tshark EK value extraction ──────────────────────────
 
-def _ek_val(obj: dict, *keys):
-    """Get a scalar from tshark EK JSON (values wrapped in arrays)."""
-    for key in keys:
+# Field name aliases across tshark versions, in priority order.  A running
+# tshark only ever emits one spelling, so _ek_val remembers which alias hit
+# last (keyed by tuple) and probes it first.
+_EK_SA = ("wlan_wlan_sa", "wlan_sa", "wlan.sa")
+_EK_TA = ("wlan_wlan_ta", "wlan_ta", "wlan.ta")
+_EK_MAC = _EK_SA + _EK_TA   # first present wins, so a blank SA drops the frame
+_EK_RSSI = (
+    "radiotap_radiotap_dbm_antsignal", "radiotap_dbm_antsignal",
+    "radiotap.dbm_antsignal",
+)
+_EK_FREQ = (
+    "radiotap_radiotap_channel_freq", "radiotap_channel_freq",
+    "radiotap.channel.freq",
+)
+_EK_SUBTYPE = (
+    "wlan_wlan_fc_type_subtype", "wlan_fc_type_subtype",
+    "wlan.fc.type_subtype",
+)
+_EK_MGT_SSID = (
+    "wlan_wlan_ssid", "wlan_mgt_wlan_mgt_ssid", "wlan_mgt_ssid",
+    "wlan.mgt.ssid",
+)
+_EK_WLAN_SSID = ("wlan_wlan_ssid", "wlan_ssid", "wlan.ssid")
+
+# alias tuple -> (alias that matched last, the aliases that outrank it)
+_live_keys: dict = {}
+
+
+def _ek_val(obj: dict, keys: tuple):
+    """Get a scalar from tshark EK JSON (values wrapped in arrays).
+
+    Same result as returning the first key present: a cached hit is only
+    taken when none of the keys ahead of it are present (free for the usual
+    first-alias hit; _EK_MAC mixes SA and TA, which can both appear).
+    """
+    live = _live_keys.get(keys)
+    if live is not None:
+        key, ahead = live
         v = obj.get(key)
         if v is not None:
-            return v[0] if isinstance(v, list) else v
+            for k in ahead:
+                if obj.get(k) is not None:
+                    break
+            else:
+                return v[0] if type(v) is list else v
+    for i, key in enumerate(keys):
+        v = obj.get(key)
+        if v is not None:
+            _live_keys[keys] = (key, keys[:i])
+            return v[0] if type(v) is list else v
     return None
 
 
-def _ek_float(obj: dict, *keys) -> Optional[float]:
-    v = _ek_val(obj, *keys)
+def _ek_float(obj: dict, keys: tuple) -> Optional[float]:
+    v = _ek_val(obj, keys)
     if v is None:
         return None
     try:
         f = float(v)
+        # float() dominates here; replacing isfinite with `f != f or f == inf`
+        # comparisons measured identical on CPython 3.11, so keep the clear form.
         return f if math.isfinite(f) else None
     except (ValueError, TypeError):
         return None
 
 
-def _ek_str(obj: dict, *keys) -> Optional[str]:
-    v = _ek_val(obj, *keys)
+def _ek_str(obj: dict, keys: tuple) -> Optional[str]:
+    v = _ek_val(obj, keys)
     if v is None:
         return None
     s = str(v).strip()
     return s if s else None
 
 
+# ── Raw-byte field extraction (pre-parse reject for checks 4/5) ──
+
+_RAW_MAC_KEYS = tuple(f'"{k}":'.encode() for k in _EK_MAC)
+_RAW_SSID_KEYS = tuple(f'"{k}":'.encode() for k in _EK_MGT_SSID + _EK_WLAN_SSID[1:])
+_UNSURE = object()
+
+
+def _raw_str(line: bytes, keys):
+    """Find the first present key and return its string value without parsing.
+
+    Mirrors _ek_str: the value may be wrapped in a one-element array.
+    Returns None if no key is present or the value is blank, or _UNSURE
+    when the value is not a plain unescaped string (caller must parse).
+    """
+    for key in keys:
+        i = line.find(key)
+        if i < 0:
+            continue
+        j = i + len(key)
+        if line.startswith(b'[', j):
+            j += 1
+        if not line.startswith(b'"', j):
+            return _UNSURE
+        k = line.find(b'"', j + 1)
+        if k < 0:
+            return _UNSURE
+        v = line[j + 1:k]
+        if b'\\' in v:
+            return _UNSURE
+        v = v.decode("utf-8", errors="replace").strip()
+        return v or None
+    return None
+
+
+def _raw_fingerprint_reject(line: bytes) -> bool:
+    """True if checks 4 (SSID) and 5 (OUI) both certainly fail for this line."""
+    mac = _raw_str(line, _RAW_MAC_KEYS)
+    if mac is None:
+        return True  # classify_frame drops frames without a source MAC
+    ssid = _raw_str(line, _RAW_SSID_KEYS)
+    if mac is _UNSURE or ssid is _UNSURE:
+        return False
+    if ssid and _ssid_re is not None and _ssid_re.search(_decode_ssid(ssid)):
+        return False
+    if _oui_drone_set and _mac_oui(mac) in _oui_drone_set:
+        return False
+    return True
+
+
+def _mac_oui(mac: str) -> str:
+    """OUI prefix of a MAC in the _oui_drone_set form ("xx:xx:xx")."""
+    oui = mac[:8].lower()
+    if "-" in oui:
+        oui = oui.replace("-", ":")
+    return oui
+
+
 # ── SSID hex decode ─────────────────────────────────────────────────
 
 def _decode_ssid(raw: str) -> str:
     """Decode hex-encoded SSID (tshark 4.0 format: '48:69:6c:74:6f:6e')."""
-    if ':' in raw and all(len(b) == 2 for b in raw.split(':')):
-        try:
-            return bytes.fromhex(raw.replace(':', '')).decode('utf-8', errors='replace')
-        except (ValueError, UnicodeDecodeError):
-            pass
+    # Byte pairs joined by single colons: length 3k+2, colons exactly at
+    # every third position.  Plain SSIDs stop at the memchr; hex ones are
+    # validated positionally instead of via a split list.
+    if ':' in raw:
+        n = len(raw)
+        k = n // 3
+        if n % 3 == 2 and raw.count(':') == k and raw[2::3] == ':' * k:
+            try:
+                return bytes.fromhex(raw.replace(':', '')).decode('utf-8', errors='replace')
+            except (ValueError, UnicodeDecodeError):
+                pass
     return raw
 
 
 # ── Public API ──────────────────────────────────────────────────────
 
-def classify_frame(line: str) -> Optional[dict]:
+def classify_frame(line: bytes, out: dict = None) -> Optional[dict]:
     """
-    Classify a single tshark NDJSON line.
+    Classify a single tshark NDJSON line (raw bytes from the pipe).
+
+    Returns {"mac", "rssi", "channel", "frame_type", "raw_json", "layers"}
+    if the frame is drone-related, or None if it should be dropped.
 
-    Returns {"mac", "rssi", "channel", "frame_type", "raw_json"} if the
-    frame is drone-related, or None if it should be dropped.
+    If `out` is given it is filled in place and returned instead of
+    allocating a new dict per frame.  The caller owns it and must be done
+    with its contents before the next call (single-threaded use only).
     """
-    _ensure_patterns()
+    if _raw_triggers is None:  # normally preloaded at startup
+        _ensure_patterns()
 
     # ── Fast reject: skip index lines ───────────────────────────
-    if not line or line[0] != '{' or line[1] == '"' and line[2] == 'i':
+    if not line.startswith(b'{') or line.startswith(b'{"index"'):
         # Catches empty, non-JSON, and '{"index"...' lines
         return None
+    # Frame lines are '{"timestamp":"...","layers":{...' — the key sits in
+    # the first few dozen bytes.  A bounded find (memmem) drops malformed
+    # and non-frame rows before the trigger scan.
+    if line.find(b'"layers"', 0, 256) < 0:
+        return None
 
     # ── Raw-string pre-filter: reject lines that can't be drones ──
     # This skips JSON parsing for ~99% of normal WiFi beacons.
-    # Single compiled regex is much faster than iterating all triggers.
-    if not _trigger_re.search(line):
-        return None
+    # Tier 1: protocol keywords via memmem (RemoteID/DJI lines stop here).
+    # Tier 2: one Aho-Corasick (or regex) scan over the OUI/SSID triggers.
+    if not (b"droneid" in line or b"drone_id" in line or b"remoteid" in line):
+        if not _trigger_search(line):
+            return None
+        # No protocol layer, so only checks 4/5 can match: run them on the
+        # raw bytes and skip the parse when both definitely fail.
+        if _raw_fingerprint_reject(line):
+            return None
 
     # ── JSON parse (only for lines that passed pre-filter) ──────
+    # orjson (and json, as fallback) accept bytes directly.
     try:
         data = _loads(line)
     except Exception:
@@ -237,49 +480,32 @@ def classify_frame(line: str) -> Optional[dict]:
 
     # ── Extract 802.11 header fields (always available) ─────────
     wlan = layers.get("wlan", {})
-    mac = _ek_str(wlan,
-        "wlan_wlan_sa", "wlan_sa", "wlan.sa",
-        "wlan_wlan_ta", "wlan_ta", "wlan.ta",
-    )
+    mac = _ek_str(wlan, _EK_MAC)
     if not mac:
         return None
 
     rt = layers.get("radiotap", {})
-    rssi = _ek_float(rt,
-        "radiotap_radiotap_dbm_antsignal",
-        "radiotap_dbm_antsignal",
-        "radiotap.dbm_antsignal",
-    )
-    channel_freq = _ek_float(rt,
-        "radiotap_radiotap_channel_freq",
-        "radiotap_channel_freq",
-        "radiotap.channel.freq",
-    )
-    channel = _FREQ_CHAN.get(int(channel_freq)) if channel_freq else None
+    rssi = _ek_float(rt, _EK_RSSI)
+    channel_freq = _ek_float(rt, _EK_FREQ)
+    channel = _freq_to_channel(int(channel_freq)) if channel_freq else None
 
     frame_type = None
 
     # ── Check 1: NAN + OpenDroneID ──────────────────────────────
-    if ("opendroneid" in layers or "open_drone_id" in layers
-            or "droneid" in layers or "remoteid" in layers):
+    has_odid = not _ODID_LAYERS.isdisjoint(layers)
+    if has_odid:
         frame_type = "remoteid_nan"
 
     # ── Check 2: Action frame RemoteID (subtype 0x000d) ─────────
     if frame_type is None:
-        subtype = _ek_val(wlan,
-            "wlan_wlan_fc_type_subtype",
-            "wlan_fc_type_subtype",
-            "wlan.fc.type_subtype",
-        )
+        subtype = _ek_val(wlan, _EK_SUBTYPE)
         if subtype is not None:
             try:
                 st = int(subtype, 0) if isinstance(subtype, str) else int(subtype)
             except (ValueError, TypeError):
                 st = None
-            if st == 0x000d:
-                if ("opendroneid" in layers or "open_drone_id" in layers
-                        or "droneid" in layers or "remoteid" in layers):
-                    frame_type = "remoteid_action"
+            if st == 0x000d and has_odid:
+                frame_type = "remoteid_action"
 
     # ── Check 3: DJI vendor IE ──────────────────────────────────
     if frame_type is None and "dji_drone_id" in layers:
@@ -288,43 +514,42 @@ def classify_frame(line: str) -> Optional[dict]:
     # ── Checks 4 & 5: Beacon/probe SSID and OUI ────────────────
     if frame_type is None:
         wlan_mgt = layers.get("wlan_wlan_mgt") or layers.get("wlan_mgt") or {}
-        ssid = _ek_str(wlan_mgt,
-            "wlan_wlan_ssid", "wlan_mgt_wlan_mgt_ssid",
-            "wlan_mgt_ssid", "wlan.mgt.ssid",
-        )
-        if not ssid:
-            ssid = _ek_str(wlan,
-                "wlan_wlan_ssid", "wlan_ssid", "wlan.ssid",
-            )
+        ssid = _ek_str(wlan_mgt, _EK_MGT_SSID) or _ek_str(wlan, _EK_WLAN_SSID)
         if ssid:
             ssid = _decode_ssid(ssid)
 
-        # Check 4: SSID match
-        if ssid and _ssid_patterns:
-            for compiled, _mfr, _model, _is_ctrl in _ssid_patterns:
-                if compiled.search(ssid):
-                    frame_type = "wifi_fingerprint"
-                    break
+        # Check 4: SSID match (one scan over the union of all patterns)
+        if ssid and _ssid_re is not None and _ssid_re.search(ssid):
+            frame_type = "wifi_fingerprint"
 
         # Check 5: OUI match
         if frame_type is None and _oui_drone_set:
-            oui = mac.upper().replace("-", ":")[:8]
-            if oui in _oui_drone_set:
+            if _mac_oui(mac) in _oui_drone_set:
                 frame_type = "wifi_fingerprint"
 
     if frame_type is None:
         return None
 
-    return {
-        "mac": mac,
-        "rssi": rssi,
-        "channel": channel,
-        "frame_type": frame_type,
-        "raw_json": line,
-        "layers": layers,
-    }
+    if out is None:
+        return {
+            "mac": mac,
+            "rssi": rssi,
+            "channel": channel,
+            "frame_type": frame_type,
+            "raw_json": line,
+            "layers": layers,
+        }
+    out["mac"] = mac
+    out["rssi"] = rssi
+    out["channel"] = channel
+    out["frame_type"] = frame_type
+    out["raw_json"] = line
+    out["layers"] = layers
+    return out
 
 
 # ── Freq → channel map (shared with capture.py for 2.4 + 5 + 6 GHz) ──
 
-from nozyme_tap.core.capture import _FREQ_TO_CHANNEL as _FREQ_CHAN
+# Bound dict.get: a dense array LUT measured ~70% slower in CPython (bounds
+# check + zero-to-None mapping cost more bytecodes than one hash probe).
+from nozyme_tap.core.capture import freq_to_channel as _freq_to_channel
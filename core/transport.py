@@ -7,13 +7,15 @@ Features:
 - Offline buffer (deque, max 1000 messages)
 - Replay buffered messages on reconnect
 - Topic-based routing (uav, heartbeat)
+- Batched wifi_frame sends (one lock acquisition per burst)
+- wifi_frames packed straight from their fields (no message dict per frame)
 """
 
 import logging
 import time
 import threading
 from collections import deque
-from typing import Optional
+from typing import Callable, Optional
 
 try:
     import zmq
@@ -22,11 +24,76 @@ try:
 except ImportError:
     HAS_ZMQ = False
 
-from nozyme_tap.core.protocol import TOPIC_UAV, TOPIC_HEARTBEAT, TOPIC_FRAME
+# Optional: msgspec's msgpack encoder — ~3x faster than msgpack.packb and
+# byte-identical for the plain dict/list/str/number/None messages sent here.
+try:
+    import msgspec
+    _msgspec_encode = msgspec.msgpack.Encoder().encode
+except ImportError:
+    msgspec = None
+    _msgspec_encode = None
+
+from nozyme_tap.core.protocol import (
+    TOPIC_UAV, TOPIC_HEARTBEAT, TOPIC_FRAME, HEARTBEAT_STATIC_FIELDS,
+    MSG_WIFI_FRAME, PROTOCOL_VERSION, utcnow_iso,
+)
 
 logger = logging.getLogger(__name__)
 
 
+if msgspec is not None:
+    class _WifiFrame(msgspec.Struct):
+        """wifi_frame message schema (see protocol.make_wifi_frame).
+
+        Structs encode as maps in field order, so the bytes are identical
+        to packing the make_wifi_frame dict — the encoder just skips the
+        per-key dict walk.  Kept here rather than in protocol.py so the
+        module shared with the command center stays dependency-free.
+        """
+        type: str
+        protocol_version: int
+        tap_uuid: str
+        timestamp: str
+        mac: str
+        rssi: Optional[float]
+        channel: Optional[int]
+        frame_type: str
+        raw_fields: dict
+
+
+class _ByteDeque(deque):
+    """Bounded deque of (topic, data) that keeps a running payload byte count.
+
+    append() accounts for the entry maxlen pushes out and returns it (None
+    if nothing was evicted). Not thread-safe on its own — ZmqTransport
+    only touches it under _lock.
+    """
+
+    def __init__(self, maxlen: int):
+        super().__init__((), maxlen)
+        self.nbytes = 0
+
+    def append(self, item):
+        evicted = None
+        if len(self) >= self.maxlen:
+            if not self.maxlen:
+                return item  # maxlen=0 keeps nothing
+            evicted = self[0]
+            self.nbytes -= len(evicted[1])
+        super().append(item)
+        self.nbytes += len(item[1])
+        return evicted
+
+    def popleft(self):
+        item = super().popleft()
+        self.nbytes -= len(item[1])
+        return item
+
+    def clear(self):
+        super().clear()
+        self.nbytes = 0
+
+
 class ZmqTransport:
     """
     ZeroMQ PUB transport for sending tap messages to CC.
@@ -45,6 +112,7 @@ class ZmqTransport:
         tap_name: str = "nozyme-tap",
         buffer_size: int = 1000,
         sndhwm: int = 1000,
+        batch_size: int = 32,
     ):
         self.host = host
         self.port = port
@@ -52,14 +120,22 @@ class ZmqTransport:
         self.tap_name = tap_name
         self.buffer_size = buffer_size
         self.sndhwm = sndhwm
+        self.batch_size = batch_size
 
         self._context: Optional[zmq.Context] = None
         self._socket: Optional[zmq.Socket] = None
         self._running = False
         self._connected = False
-        self._buffer = deque(maxlen=buffer_size)
+        self._buffer = _ByteDeque(buffer_size)
         self._lock = threading.Lock()
-        self._buffer_bytes = 0
+        # Packed wifi_frames awaiting flush() — touched by the frame worker only
+        self._pending: list = []
+        # Pre-packed static heartbeat fields, rebuilt only if they change
+        self._hb_static_items: Optional[tuple] = None
+        self._hb_static_pairs: dict = {}
+        # msgpack encoder for whole messages (and wifi_frame field values)
+        self._tls = threading.local()
+        self._encode = _msgspec_encode or self._packb
         self._stats = {
             "sent": 0,
             "buffered": 0,
@@ -88,6 +164,11 @@ class ZmqTransport:
         self._socket.setsockopt(zmq.TCP_KEEPALIVE_IDLE, 60)
         self._socket.setsockopt(zmq.TCP_KEEPALIVE_INTVL, 10)
         self._socket.setsockopt(zmq.TCP_KEEPALIVE_CNT, 3)
+        # Deliberately not set: IMMEDIATE (a connecting PUB would then drop
+        # everything while the node is down instead of queueing up to SNDHWM
+        # in the reconnect pipe — PUB never raises Again to reach our own
+        # buffer), CONFLATE (breaks [topic, payload] multipart), TCP_NODELAY
+        # (libzmq already sets it on every TCP socket).
 
         endpoint = f"tcp://{self.host}:{self.port}"
         logger.info(f"ZMQ PUB connecting to {endpoint}")
@@ -115,78 +196,238 @@ class ZmqTransport:
 
     def send_heartbeat(self, heartbeat: dict):
         """Send a tap heartbeat via ZMQ."""
-        self._send(TOPIC_HEARTBEAT, heartbeat)
+        self._send_packed(TOPIC_HEARTBEAT, [self._pack_heartbeat(heartbeat)])
+
+    def _pack_heartbeat(self, heartbeat: dict) -> bytes:
+        """msgpack-encode a heartbeat, reusing the cached static fields.
+
+        A msgpack map is a header plus concatenated key/value pairs, so the
+        static pairs are packed once and spliced in at their place in the
+        dict; only the dynamic ones are packed per call.  Always msgpack,
+        even when msgspec is available: the splicing needs per-pair bytes,
+        which the msgspec encoder doesn't expose, and the output is the
+        same map either way.
+        """
+        packer = self._packer()
+        pack = packer.pack
+        static_items = tuple(
+            (k, heartbeat[k]) for k in HEARTBEAT_STATIC_FIELDS if k in heartbeat
+        )
+        if static_items != self._hb_static_items:
+            self._hb_static_pairs = {k: pack(k) + pack(v) for k, v in static_items}
+            self._hb_static_items = static_items
+
+        static = self._hb_static_pairs
+        parts = [packer.pack_map_header(len(heartbeat))]
+        for k, v in heartbeat.items():
+            pair = static.get(k)
+            parts.append(pair if pair is not None else pack(k) + pack(v))
+        return b"".join(parts)
 
     def send_wifi_frame(self, frame: dict):
         """Send a wifi_frame message via ZMQ (new fast-sensor pipeline)."""
         self._send(TOPIC_FRAME, frame)
 
+    def make_wifi_frame_enqueuer(self, tap_uuid: str) -> Callable[..., None]:
+        """Return a function that queues wifi_frames for tap_uuid.
+
+        The returned function takes (mac, rssi, channel, frame_type,
+        raw_fields) and queues the same msgpack bytes as packing
+        make_wifi_frame(...) — same keys, same order — without building the
+        message dict: the map header, every key and the constant envelope
+        values are packed once here (or, with msgspec, a _WifiFrame struct
+        is encoded in one call).  The batch flushes itself once batch_size
+        frames are pending; callers should also flush() whenever their input
+        goes idle.  Frame worker only (it appends to the unlocked pending
+        batch).
+        """
+        now_iso = utcnow_iso
+
+        if msgspec is not None and self._encode is _msgspec_encode:
+            encode = self._encode
+            frame_cls = _WifiFrame
+            msg_type = MSG_WIFI_FRAME
+            version = PROTOCOL_VERSION
+
+            def _enqueue_struct(mac: str, rssi: float, channel: int,
+                                frame_type: str, raw_fields: dict):
+                pending = self._pending  # flush() swaps the list
+                pending.append(encode(frame_cls(
+                    msg_type, version, tap_uuid, now_iso(),
+                    mac, rssi, channel, frame_type, raw_fields,
+                )))
+                if len(pending) >= self.batch_size:
+                    self.flush()
+
+            return _enqueue_struct
+
+        # Owned by the frame worker, so no per-thread lookup per value
+        pack = msgpack.Packer(use_bin_type=True).pack
+        prefix = b"".join((
+            msgpack.Packer().pack_map_header(9),
+            pack("type"), pack(MSG_WIFI_FRAME),
+            pack("protocol_version"), pack(PROTOCOL_VERSION),
+            pack("tap_uuid"), pack(tap_uuid),
+            pack("timestamp"),
+        ))
+        k_mac, k_rssi, k_channel, k_frame_type, k_raw = (
+            pack(k) for k in ("mac", "rssi", "channel", "frame_type", "raw_fields")
+        )
+        join = b"".join
+
+        def _enqueue(mac: str, rssi: float, channel: int, frame_type: str,
+                     raw_fields: dict):
+            pending = self._pending  # flush() swaps the list
+            pending.append(join((
+                prefix, pack(now_iso()),
+                k_mac, pack(mac),
+                k_rssi, pack(rssi),
+                k_channel, pack(channel),
+                k_frame_type, pack(frame_type),
+                k_raw, pack(raw_fields),
+            )))
+            if len(pending) >= self.batch_size:
+                self.flush()
+
+        return _enqueue
+
+    def flush(self):
+        """Send all queued wifi_frames under a single lock acquisition."""
+        if not self._pending:
+            return
+        batch = self._pending
+        self._pending = []
+        self._send_packed(TOPIC_FRAME, batch)
+
+    def _packb(self, obj) -> bytes:
+        """msgpack.packb, but reusing a per-thread Packer.
+
+        packb builds (and frees) a Packer and its buffer on every call —
+        ~650ns, most of the cost of a small message. Packer isn't
+        thread-safe, hence one per calling thread.
+        """
+        try:
+            pack = self._tls.pack
+        except AttributeError:
+            pack = self._tls.pack = self._packer().pack
+        return pack(obj)
+
+    def _packer(self) -> "msgpack.Packer":
+        """This thread's msgpack Packer, created on first use."""
+        try:
+            return self._tls.packer
+        except AttributeError:
+            packer = self._tls.packer = msgpack.Packer(use_bin_type=True)
+            return packer
+
     def _send(self, topic: bytes, payload: dict):
         """Send a message, buffering if disconnected."""
-        data = msgpack.packb(payload, use_bin_type=True)
-
+        self._send_packed(topic, [self._encode(payload)])
+
+    def _send_packed(self, topic: bytes, batch: list):
+        """Send already-packed payloads, buffering whatever can't go out.
+
+        Each payload is still its own [topic, payload] multipart message
+        (see PROTOCOL.md); only the lock and stats updates are amortized.
+        The two parts go out as two send() calls rather than through
+        send_multipart, whose per-call list walk and checks cost ~3x more
+        in pyzmq for the same frames on the wire. Payloads are handed over
+        with copy=False: the bytes object is already immutable and kept
+        alive by refcounting, so zmq can reference it instead of copying.
+        """
         with self._lock:
+            sent = 0
             if self._socket and self._connected:
-                try:
-                    self._socket.send_multipart([topic, data], zmq.NOBLOCK)
-                    self._stats["sent"] += 1
-                    self._stats["bytes_sent"] += len(data)
-                    return
-                except zmq.Again:
-                    # HWM reached, buffer
-                    logger.debug("ZMQ HWM reached, buffering message")
-                except zmq.ZMQError as e:
-                    logger.warning(f"ZMQ send error: {e}")
-                    self._stats["errors"] += 1
-
-            # Buffer the message for later replay (with byte tracking)
-            # If buffer is full, deque silently evicts oldest — adjust bytes
-            if len(self._buffer) >= self._buffer.maxlen:
-                _, evicted_data = self._buffer[0]
-                self._buffer_bytes -= len(evicted_data)
-                logger.warning(
-                    "Transport buffer full (%d), evicting oldest message (%d bytes)",
-                    self._buffer.maxlen, len(evicted_data),
-                )
-
-            msg_size = len(data)
-            self._buffer.append((topic, data))
-            self._buffer_bytes += msg_size
-            self._stats["buffered"] += 1
+                send = self._socket.send
+                more = zmq.SNDMORE | zmq.NOBLOCK
+                last = zmq.NOBLOCK
+                bytes_sent = 0
+                for data in batch:
+                    try:
+                        send(topic, more)
+                        send(data, last, copy=False, track=False)
+                    except zmq.Again:
+                        # HWM reached, buffer the rest
+                        logger.debug("ZMQ HWM reached, buffering message")
+                        break
+                    except zmq.ZMQError as e:
+                        logger.warning(f"ZMQ send error: {e}")
+                        self._stats["errors"] += 1
+                        break
+                    sent += 1
+                    bytes_sent += len(data)
+                self._stats["sent"] += sent
+                self._stats["bytes_sent"] += bytes_sent
+
+            for data in batch[sent:]:
+                self._buffer_message(topic, data)
+
+    def _buffer_message(self, topic: bytes, data: bytes):
+        """Buffer a message for later replay (caller holds _lock)."""
+        evicted = self._buffer.append((topic, data))
+        if evicted is not None:
+            logger.warning(
+                "Transport buffer full (%d), evicting oldest message (%d bytes)",
+                self._buffer.maxlen, len(evicted[1]),
+            )
+        self._stats["buffered"] += 1
+
+    # Messages replayed per lock acquisition.  The socket itself must stay
+    # under _lock (ZMQ sockets are not thread-safe, and each message is two
+    # send() calls), but producers get a turn between slices.
+    REPLAY_SLICE = 64
 
     def _replay_buffer(self):
         """Replay buffered messages after reconnection."""
         with self._lock:
             count = len(self._buffer)
-            if count == 0:
-                return
-
-            logger.info(f"Replaying {count} buffered messages")
-            replayed = 0
-
-            while self._buffer:
-                topic, data = self._buffer.popleft()
-                self._buffer_bytes -= len(data)
-                try:
-                    self._socket.send_multipart([topic, data], zmq.NOBLOCK)
-                    self._stats["bytes_sent"] += len(data)
-                    replayed += 1
-                except Exception as e:
-                    # Re-buffer if send fails
-                    self._buffer.appendleft((topic, data))
-                    self._buffer_bytes += len(data)
-                    remaining = len(self._buffer)
-                    logger.warning(
-                        f"Replay failed after {replayed}/{count}: {e} "
-                        f"({remaining} still buffered)"
-                    )
+        if count == 0:
+            return
+
+        logger.info(f"Replaying {count} buffered messages")
+        more = zmq.SNDMORE | zmq.NOBLOCK
+        last = zmq.NOBLOCK
+        replayed = 0
+        failed = None
+
+        while failed is None:
+            with self._lock:
+                buf = self._buffer
+                if not buf:
                     break
-
-            self._stats["replayed"] += replayed
-            logger.info(f"Replayed {replayed}/{count} messages")
+                send = self._socket.send
+                n = 0
+                nbytes = 0
+                while buf and n < self.REPLAY_SLICE:
+                    topic, data = buf[0]
+                    try:
+                        send(topic, more)
+                        send(data, last, copy=False, track=False)
+                    except Exception as e:
+                        # Leave the message at the head for the next replay
+                        failed = e
+                        break
+                    buf.popleft()
+                    n += 1
+                    nbytes += len(data)
+                self._stats["bytes_sent"] += nbytes
+                self._stats["replayed"] += n
+                replayed += n
+                remaining = len(buf)
+
+        if failed is not None:
+            logger.warning(
+                f"Replay failed after {replayed}/{count}: {failed} "
+                f"({remaining} still buffered)"
+            )
+        logger.info(f"Replayed {replayed}/{count} messages")
 
     def stop(self):
         """Close ZMQ socket and context."""
+        try:
+            self.flush()
+        except Exception as e:
+            logger.debug(f"Error flushing pending frames: {e}")
         self._running = False
         self._connected = False
 
@@ -218,12 +459,12 @@ class ZmqTransport:
     @property
     def buffered_bytes(self) -> int:
         with self._lock:
-            return self._buffer_bytes
+            return self._buffer.nbytes
 
     @property
     def stats(self) -> dict:
         with self._lock:
             s = dict(self._stats)
             s["buffer_count"] = len(self._buffer)
-            s["buffer_bytes"] = self._buffer_bytes
+            s["buffer_bytes"] = self._buffer.nbytes
         return s
@@ -15,7 +15,8 @@ Detection is based on:
 Performance:
 - Positive matches cached by MAC (O(1) for repeat beacons from same drone)
 - OUI check is O(1) dict lookup
-- SSID patterns are pre-compiled regexes tested in priority order
+- SSID patterns are folded into one union regex that rejects non-drone
+  SSIDs in a single scan; only hits walk the patterns in priority order
 
 Model extraction:
 - DJI SSIDs parsed for specific model: "DJI-MINI4PRO-726" -> "DJI Mini 4 Pro"
@@ -26,21 +27,33 @@ import json
 import re
 import logging
 import threading
-from collections import OrderedDict
+from itertools import islice
 from pathlib import Path
 from typing import Optional, Dict, List, Tuple
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 logger = logging.getLogger(__name__)
 
 # Regex to extract model code from DJI SSIDs
 # Matches: "DJI-MINI4PRO-726", "DJI_MAVIC3_1234", "DJI AVATA2 ABC"
 _DJI_SSID_RE = re.compile(r'^DJI[-_ ]([A-Z0-9]+?)(?:[-_ ]\w+)?$', re.IGNORECASE)
 
+# Parsed + compiled pattern data per (models path, mtime), shared by every
+# instance: the 300+ regex compiles dominate construction. Only successful
+# loads are stored; the tuples' contents are read-only after _load.
+_pattern_cache: Dict[Tuple[str, int], tuple] = {}
+
 
 class WiFiFingerprint:
     """
     Matches WiFi beacon/probe frames against known drone signatures.
-    Thread-safe: lock protects mutable caches and stats.
+    Thread-safe: lock serializes cache mutation; the cache-hit fast path
+    reads lock-free (single dict/set lookups are atomic under the GIL).
     """
 
     def __init__(self, models_path: str = None):
@@ -48,12 +61,16 @@ class WiFiFingerprint:
 
         # Pattern data (loaded once, read-only after init)
         self._ssid_patterns: List[Tuple[re.Pattern, str, str, bool]] = []
+        self._ssid_union: Optional[re.Pattern] = None
+        self._ssid_union_indexed = False
         self._oui_drone_set: set = set()
         self._oui_info: Dict[str, str] = {}
         self._dji_ssid_models: Dict[str, str] = {}
 
-        # Positive match cache: MAC -> result dict (OrderedDict for O(1) LRU eviction)
-        self._match_cache: OrderedDict = OrderedDict()
+        # Positive match cache: MAC -> result dict. Plain dict, FIFO eviction
+        # in insertion order: drones beacon continuously, so recency
+        # tracking buys nothing over first-in-first-out here.
+        self._match_cache: Dict[str, dict] = {}
         self._match_cache_cap = 5000
 
         # Negative cache: MACs confirmed as non-drone (avoids repeat regex checks)
@@ -76,13 +93,20 @@ class WiFiFingerprint:
         else:
             models_path = Path(models_path)
 
-        if not models_path.exists():
+        try:
+            cache_key = (str(models_path), models_path.stat().st_mtime_ns)
+        except OSError:
             logger.warning(f"drone_models.json not found at {models_path}")
             return
+        cached = _pattern_cache.get(cache_key)
+        if cached is not None:
+            (self._ssid_patterns, self._ssid_union, self._ssid_union_indexed,
+             self._oui_drone_set, self._oui_info, self._dji_ssid_models) = cached
+            return
 
         try:
-            with open(models_path, "r") as f:
-                data = json.load(f)
+            with open(models_path, "rb") as f:
+                data = _loads(f.read())
         except Exception as e:
             logger.error(f"Failed to load drone_models.json: {e}")
             return
@@ -106,6 +130,32 @@ class WiFiFingerprint:
             except re.error as e:
                 logger.warning(f"Invalid SSID pattern '{pattern_str}': {e}")
 
+        # The union finds the leftmost match rather than the first pattern in
+        # priority order. When every pattern is ^-anchored (no top-level |,
+        # no groups of its own) all matches start at 0, where alternatives
+        # are tried in order, so the matching group *is* the priority winner.
+        # Otherwise it only answers "does anything match?" and hits fall
+        # back to the ordered walk.
+        if self._ssid_patterns:
+            self._ssid_union_indexed = all(
+                c.pattern.startswith("^") and "|" not in c.pattern and not c.groups
+                for c, *_ in self._ssid_patterns
+            )
+            if self._ssid_union_indexed:
+                parts = [f"(?P<g{i}>{c.pattern})"
+                         for i, (c, *_) in enumerate(self._ssid_patterns)]
+            else:
+                parts = [f"(?:{c.pattern})" for c, *_ in self._ssid_patterns]
+            try:
+                self._ssid_union = re.compile("|".join(parts), re.IGNORECASE)
+            except re.error:
+                # e.g. numbered backreferences shifted by the wrapper groups
+                self._ssid_union_indexed = False
+                self._ssid_union = re.compile(
+                    "|".join(f"(?:{c.pattern})" for c, *_ in self._ssid_patterns),
+                    re.IGNORECASE,
+                )
+
         # Load OUI map — only drone entries (not controllers)
         for oui, desc in data.get("oui_map", {}).items():
             oui_upper = oui.upper()
@@ -113,6 +163,10 @@ class WiFiFingerprint:
             if "(drone)" in desc.lower():
                 self._oui_drone_set.add(oui_upper)
 
+        _pattern_cache[cache_key] = (
+            self._ssid_patterns, self._ssid_union, self._ssid_union_indexed,
+            self._oui_drone_set, self._oui_info, self._dji_ssid_models,
+        )
         logger.info(
             f"WiFi fingerprint loaded: {len(self._ssid_patterns)} SSID patterns, "
             f"{len(self._oui_drone_set)} drone OUIs, "
@@ -131,19 +185,28 @@ class WiFiFingerprint:
             Dict with match info if drone detected, None otherwise.
             Keys: manufacturer, model, designation, match_type, is_controller
         """
-        mac_upper = mac.upper().replace("-", ":") if mac else ""
+        # tshark emits colon-separated MACs; only pay for replace() when a
+        # dash-separated one shows up (str.translate is ~7x slower here)
+        mac_upper = mac.upper() if mac else ""
+        if "-" in mac_upper:
+            mac_upper = mac_upper.replace("-", ":")
 
-        with self._lock:
-            self._stats["checked"] += 1
+        # Lock-free fast path. The counters are plain increments: a rare
+        # lost update under contention only skews stats, never results.
+        stats = self._stats
+        stats["checked"] += 1
 
-            # Fast path: cached positive match for this MAC
-            if mac_upper and mac_upper in self._match_cache:
-                self._stats["cache_hits"] += 1
-                return self._match_cache[mac_upper]
+        if mac_upper:
+            # Fast path: cached positive match for this MAC. get() rather
+            # than in + [] so a concurrent eviction can't raise KeyError.
+            cached = self._match_cache.get(mac_upper)
+            if cached is not None:
+                stats["cache_hits"] += 1
+                return cached
 
             # Fast path: known non-drone MAC (skip regex entirely)
-            if mac_upper and not ssid and mac_upper in self._negative_cache:
-                self._stats["cache_hits"] += 1
+            if not ssid and mac_upper in self._negative_cache:
+                stats["cache_hits"] += 1
                 return None
 
         # --- Full check (pattern matching is read-only, no lock needed) ---
@@ -180,8 +243,17 @@ class WiFiFingerprint:
 
     def _check_ssid(self, ssid: str) -> Optional[dict]:
         """Check SSID against known drone patterns."""
-        for compiled, manufacturer, model, is_controller in self._ssid_patterns:
-            if not compiled.search(ssid):
+        if self._ssid_union is None:
+            return None
+        m = self._ssid_union.search(ssid)
+        if m is None:
+            return None
+        if self._ssid_union_indexed:
+            candidates = (self._ssid_patterns[int(m.lastgroup[1:])],)
+        else:
+            candidates = self._ssid_patterns
+        for compiled, manufacturer, model, is_controller in candidates:
+            if candidates is self._ssid_patterns and not compiled.search(ssid):
                 continue
 
             # Try to extract specific model from DJI SSID
@@ -254,14 +326,13 @@ class WiFiFingerprint:
         return None
 
     def _cache_positive(self, mac_upper: str, result: dict):
-        """Cache a positive match with LRU eviction."""
-        if mac_upper in self._match_cache:
-            self._match_cache.move_to_end(mac_upper)
-        elif len(self._match_cache) >= self._match_cache_cap:
+        """Cache a positive match. Evicts oldest 25% when full."""
+        cache = self._match_cache
+        if mac_upper not in cache and len(cache) >= self._match_cache_cap:
             evict = self._match_cache_cap // 4
-            for _ in range(evict):
-                self._match_cache.popitem(last=False)
-        self._match_cache[mac_upper] = result
+            for k in list(islice(cache, evict)):
+                del cache[k]
+        cache[mac_upper] = result
         # Remove from negative cache if present
         self._negative_cache.discard(mac_upper)
 
@@ -276,7 +347,8 @@ class WiFiFingerprint:
 
     def cleanup_stale(self):
         """Periodic cleanup — clear negative cache to allow re-detection."""
-        self._negative_cache.clear()
+        with self._lock:
+            self._negative_cache.clear()
 
     @property
     def stats(self) -> dict:
@@ -1,4 +1,13 @@
 """nozyme-tap system utilities: config, health, watchdog."""
 from .config import TapConfig
-from .health import get_system_health
-from .watchdog import Watchdog
+
+
+def __getattr__(name):
+    """Lazy import for health/watchdog (only needed once the tap is running)."""
+    if name == "get_system_health":
+        from .health import get_system_health
+        return get_system_health
+    if name == "Watchdog":
+        from .watchdog import Watchdog
+        return Watchdog
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,65 @@
+"""
+nozyme-tap CPU affinity and scheduling helpers.
+Pins hot-path threads to dedicated cores so frame-processing state stays
+cache-resident instead of migrating between CPUs, and lets latency-critical
+low-duty threads (the channel hopper) run under SCHED_FIFO.
+"""
+
+import os
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def pin_current_thread(cpu: Optional[int], role: str) -> bool:
+    """Pin the calling thread to a single CPU (Linux only).
+
+    No-op when cpu is None.  Failures (non-Linux, CPU offline, no
+    permission) are logged and ignored — affinity is an optimization only.
+
+    Returns:
+        True if the thread was pinned.
+    """
+    if cpu is None:
+        return False
+    if not hasattr(os, "sched_setaffinity"):
+        logger.debug(f"sched_setaffinity unavailable, not pinning {role} thread")
+        return False
+    try:
+        # pid 0 = calling thread (affinity is per-task on Linux)
+        os.sched_setaffinity(0, {int(cpu)})
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning(f"Cannot pin {role} thread to CPU {cpu}: {e}")
+        return False
+    logger.info(f"Pinned {role} thread to CPU {cpu}")
+    return True
+
+
+def set_realtime_priority(priority: int, role: str) -> bool:
+    """Run the calling thread under SCHED_FIFO at the given priority (Linux only).
+
+    No-op when priority is 0/None.  Needs CAP_SYS_NICE (root); failures are
+    logged and ignored — the thread keeps its normal CFS scheduling.
+
+    Returns:
+        True if the policy was applied.
+    """
+    if not priority:
+        return False
+    if not hasattr(os, "sched_setscheduler"):
+        logger.debug(f"sched_setscheduler unavailable, {role} thread stays SCHED_OTHER")
+        return False
+    try:
+        # pid 0 = calling thread (scheduling policy is per-task on Linux).
+        # RESET_ON_FORK: children (the hopper's `iw` fallback) start as
+        # SCHED_OTHER instead of inheriting the RT policy.
+        os.sched_setscheduler(
+            0, os.SCHED_FIFO | os.SCHED_RESET_ON_FORK,
+            os.sched_param(int(priority)),
+        )
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning(f"Cannot set SCHED_FIFO priority {priority} for {role} thread: {e}")
+        return False
+    logger.info(f"{role} thread running SCHED_FIFO priority {priority}")
+    return True
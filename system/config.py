@@ -13,15 +13,27 @@ import tempfile
 from pathlib import Path
 from typing import Dict, Any, List
 
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
 logger = logging.getLogger(__name__)
 
-# Valid WiFi channels per band
-VALID_CHANNELS_24GHZ = set(range(1, 15))     # 1-14
+# Valid WiFi channels per band (contiguous bands as ranges: O(1) `in`)
+VALID_CHANNELS_24GHZ = range(1, 15)          # 1-14
 VALID_CHANNELS_5GHZ = {36, 40, 44, 48, 52, 56, 60, 64,
                        100, 104, 108, 112, 116, 120, 124, 128,
                        132, 136, 140, 144, 149, 153, 157, 161, 165, 169, 173, 177}
-VALID_CHANNELS_6GHZ = set(range(1, 234))     # 6GHz: channels 1-233 (UNII-5 through UNII-8)
-VALID_CHANNELS = VALID_CHANNELS_24GHZ | VALID_CHANNELS_5GHZ | VALID_CHANNELS_6GHZ
+VALID_CHANNELS_6GHZ = range(1, 234)          # 6GHz: channels 1-233 (UNII-5 through UNII-8)
+VALID_CHANNELS = set(VALID_CHANNELS_24GHZ) | VALID_CHANNELS_5GHZ | set(VALID_CHANNELS_6GHZ)
 
 BAND_NAMES = ("24ghz", "5ghz", "6ghz")
 VALID_BY_BAND = {
@@ -58,12 +70,16 @@ DEFAULT_CONFIG = {
     "channels_6ghz": [],
     "channel_dwell_ms": 350,
     "tshark_path": "/usr/bin/tshark",
+    "tshark_snaplen": 0,
+    "tshark_buffer_mb": 16,
+    "tshark_stderr_log": None,
     "latitude": 0.0,
     "longitude": 0.0,
     "heartbeat_interval_s": 10,
     "log_level": "INFO",
     "zmq_buffer_size": 1000,
     "zmq_hwm": 1000,
+    "zmq_batch_size": 32,
     "starvation_timeout_s": 30,
     "tshark_restart_delay_s": 1,
     "update_throttle_s": 0.5,
@@ -72,10 +88,15 @@ DEFAULT_CONFIG = {
     "stale_cleanup_interval_s": 60,
     "watchdog_check_interval_s": 2,
     "memory_percent_threshold": 90.0,
+    "frame_queue_size": 4096,
+    "cpu_affinity": {},
+    "hopper_rt_priority": 10,
     "pcap_enabled": False,
     "pcap_path": "/var/lib/nozyme/pcap",
     "pcap_ring_filesize_kb": 10240,
     "pcap_ring_files": 10,
+    "pcap_use_tmpfs": False,
+    "pcap_backend": "dumpcap",
 }
 
 
@@ -94,8 +115,8 @@ class TapConfig:
 
         if self.config_path and self.config_path.exists():
             try:
-                with open(self.config_path, 'r') as f:
-                    loaded = json.load(f)
+                with open(self.config_path, 'rb') as f:
+                    loaded = _loads(f.read())
                 self._loaded_keys = set(loaded.keys())
                 for key, value in loaded.items():
                     self.data[key] = value
@@ -166,10 +187,12 @@ class TapConfig:
                 logger.warning(f"{key} is not a list, resetting to []")
                 channels = []
             valid_set = VALID_BY_BAND[band_name]
-            invalid = [ch for ch in channels if ch not in valid_set]
+            valid, invalid = [], []
+            for ch in channels:
+                (valid if ch in valid_set else invalid).append(ch)
             if invalid:
                 logger.warning(f"Invalid {band_name} channels removed: {invalid}")
-                channels = [ch for ch in channels if ch in valid_set]
+                channels = valid
             self.data[key] = channels
             total_valid += len(channels)
 
@@ -202,6 +225,9 @@ class TapConfig:
                 pcap_path.mkdir(parents=True, exist_ok=True)
             except OSError as e:
                 logger.warning(f"Cannot create pcap_path {pcap_path}: {e}")
+        if self.data.get("pcap_backend") not in ("dumpcap", "tpacket"):
+            logger.warning(f"Invalid pcap_backend={self.data.get('pcap_backend')}, using dumpcap")
+            self.data["pcap_backend"] = "dumpcap"
         for key in ("pcap_ring_filesize_kb", "pcap_ring_files"):
             val = self.data.get(key)
             if val is not None and val <= 0:
@@ -209,6 +235,31 @@ class TapConfig:
                 logger.warning(f"Invalid {key}={val}, using {default}")
                 self.data[key] = default
 
+        # tshark snaplen / capture buffer (0 = tshark default)
+        for key in ("tshark_snaplen", "tshark_buffer_mb"):
+            val = self.data.get(key)
+            if val is not None and (not isinstance(val, int) or val < 0):
+                default = DEFAULT_CONFIG[key]
+                logger.warning(f"Invalid {key}={val}, using {default}")
+                self.data[key] = default
+
+        # Frame queue bound (0 would drop every line, <0 fails at startup)
+        val = self.data.get("frame_queue_size")
+        if val is not None and (not isinstance(val, int) or val <= 0):
+            default = DEFAULT_CONFIG["frame_queue_size"]
+            logger.warning(f"Invalid frame_queue_size={val}, using {default}")
+            self.data["frame_queue_size"] = default
+
+        # CPU pinning: {"worker"|"hopper"|"tshark": cpu index}
+        aff = self.data.get("cpu_affinity")
+        if aff is not None and not (
+            isinstance(aff, dict)
+            and all(k in ("worker", "hopper", "tshark") for k in aff)
+            and all(isinstance(v, int) and v >= 0 for v in aff.values())
+        ):
+            logger.warning(f"Invalid cpu_affinity={aff}, disabling CPU pinning")
+            self.data["cpu_affinity"] = {}
+
     # Fallback UUID file locations (checked in order)
     _UUID_PATHS = [
         Path("/home/tap/.tap_uuid"),
@@ -251,21 +302,25 @@ class TapConfig:
             return
         try:
             self.config_path.parent.mkdir(parents=True, exist_ok=True)
-            content = json.dumps(self.data, indent=4)
+            content = _dumps(self.data)
             self._atomic_write(self.config_path, content)
             logger.info(f"Config saved to {self.config_path}")
         except Exception as e:
             logger.warning(f"Could not save config: {e}")
 
     @staticmethod
-    def _atomic_write(path: Path, content: str):
-        """Write content to path atomically via temp file + rename.
+    def _atomic_write(path: Path, content):
+        """Write content (str or bytes) to path atomically via temp file + rename.
         Survives power loss — either old or new content, never partial.
+        f.flush() stays before fsync: fsync only sees what left Python's
+        userspace buffer.
         """
+        if isinstance(content, str):
+            content = content.encode()
         parent = path.parent
         fd, tmp_path = tempfile.mkstemp(dir=parent, prefix=".tmp_", suffix=".nozyme")
         try:
-            with os.fdopen(fd, 'w') as f:
+            with os.fdopen(fd, 'wb') as f:
                 f.write(content)
                 f.flush()
                 os.fsync(f.fileno())
@@ -277,6 +332,16 @@ class TapConfig:
             except OSError:
                 pass
             raise
+        # fsync the directory too, or the rename itself can be lost on power
+        # failure. Best effort: some filesystems refuse fsync on a dir fd.
+        try:
+            dir_fd = os.open(parent, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
 
     def __getattr__(self, name):
         if name in ('data', 'config_path') or name.startswith('_'):
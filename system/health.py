@@ -4,21 +4,104 @@ CPU, memory, temperature for heartbeat messages.
 """
 
 import os
+import re
 import logging
+import threading
 import time
-from collections import deque
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
 
 logger = logging.getLogger(__name__)
 
+# Max age of a cached get_system_health() sample. Heartbeats (10s) and the
+# watchdog (2s) both sample; neither needs fresher than this.
+HEALTH_CACHE_TTL_S = 5.0
+
+_health_cache = (0.0, None)  # (time.monotonic() of sample, result dict)
+
+# Whole-disk devices counted for disk_writes_total: mmcblk* (SD card) or
+# sd* (USB/SATA), skipping partitions (mmcblk0p1, sda1)
+_DISK_DEV_RE = re.compile(rb'mmcblk[^p]*|sd.*[A-Za-z]')
+
+
+# /proc and /sys files kept open for the life of the process: pread() at
+# offset 0 makes the kernel regenerate the contents, so no open()/close()
+# per sample. fds are non-inheritable (PEP 446), so tshark never sees them.
+_proc_fds: dict = {}
+_proc_fds_lock = threading.Lock()
+
 
-def get_system_health() -> dict:
+def _proc_fd(path: str) -> int:
+    """Return the cached read-only fd for path, opening it on first use."""
+    fd = _proc_fds.get(path)
+    if fd is None:
+        with _proc_fds_lock:
+            fd = _proc_fds.get(path)
+            if fd is None:
+                fd = _proc_fds[path] = os.open(path, os.O_RDONLY)
+    return fd
+
+
+def _read_proc(path: str, size: int = 8192) -> bytes:
+    """Read a /proc or /sys file, in a single pread() when it fits in size.
+
+    One read also gets a consistent snapshot: procfs regenerates the text
+    per read call, so line-by-line reads can mix two generations. A failed
+    read drops the cached fd and retries once on a fresh one (e.g. a
+    thermal zone that went away and came back).
+    """
+    for retry in (False, True):
+        fd = _proc_fd(path)
+        try:
+            data = os.pread(fd, size, 0)
+            if len(data) == size:  # didn't fit — read the rest
+                chunks = [data]
+                offset = size
+                while True:
+                    chunk = os.pread(fd, size, offset)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                    offset += len(chunk)
+                data = b"".join(chunks)
+            return data
+        except OSError:
+            with _proc_fds_lock:
+                if _proc_fds.get(path) == fd:
+                    del _proc_fds[path]
+                    try:
+                        os.close(fd)
+                    except OSError:
+                        pass
+            if retry:
+                raise
+
+
+def get_system_health(max_age_s: float = HEALTH_CACHE_TTL_S) -> dict:
     """
     Get system health metrics for tap heartbeat.
 
+    Samples are cached for up to max_age_s seconds; pass 0 to force a
+    fresh read (which also refreshes the cache for other callers).
+
     Returns:
         Dict with: cpu_load, cpu_percent, memory_used, memory_total,
                     temperature, disk_free
     """
+    global _health_cache
+    ts, cached = _health_cache
+    now = time.monotonic()
+    if cached is None or now - ts >= max_age_s:
+        cached = _collect_system_health()
+        _health_cache = (now, cached)
+    return dict(cached)
+
+
+def _collect_system_health() -> dict:
+    """Read all health metrics from the system (uncached)."""
     result = {
         "cpu_load": 0.0,
         "cpu_percent": 0.0,
@@ -38,39 +121,35 @@ def get_system_health() -> dict:
         ncpu = os.cpu_count() or 1
         result["cpu_percent"] = round(min(load[0] / ncpu * 100.0, 100.0), 1)
     except (OSError, AttributeError):
-        try:
-            import psutil
-            pct = psutil.cpu_percent(interval=0.1)
+        if psutil is not None:
+            # Non-blocking: CPU use since the previous call (0.0 on the
+            # first). interval=0.1 would stall the heartbeat for 100ms.
+            pct = psutil.cpu_percent(interval=None)
             result["cpu_load"] = pct / 100.0
             result["cpu_percent"] = pct
-        except ImportError:
-            pass
 
     # Memory
-    try:
-        import psutil
+    if psutil is not None:
         mem = psutil.virtual_memory()
         result["memory_used"] = mem.used
         result["memory_total"] = mem.total
-    except ImportError:
+    else:
         # Fallback: read /proc/meminfo on Linux
         try:
-            with open('/proc/meminfo', 'r') as f:
-                lines = f.readlines()
-                mem_total = 0
-                mem_available = 0
-                found = 0
-                for line in lines:
-                    if line.startswith('MemTotal:'):
-                        mem_total = int(line.split()[1]) * 1024  # kB to bytes
-                        found += 1
-                    elif line.startswith('MemAvailable:'):
-                        mem_available = int(line.split()[1]) * 1024
-                        found += 1
-                    if found >= 2:
-                        break
-                result["memory_total"] = mem_total
-                result["memory_used"] = mem_total - mem_available
+            mem_total = 0
+            mem_available = 0
+            found = 0
+            for line in _read_proc('/proc/meminfo').split(b'\n'):
+                if line.startswith(b'MemTotal:'):
+                    mem_total = int(line.split()[1]) * 1024  # kB to bytes
+                    found += 1
+                elif line.startswith(b'MemAvailable:'):
+                    mem_available = int(line.split()[1]) * 1024
+                    found += 1
+                if found >= 2:
+                    break
+            result["memory_total"] = mem_total
+            result["memory_used"] = mem_total - mem_available
         except Exception:
             pass
 
@@ -82,36 +161,33 @@ def get_system_health() -> dict:
 
     # CPU temperature (Raspberry Pi thermal_zone0)
     try:
-        with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-            temp_millideg = int(f.read().strip())
-            result["temperature"] = temp_millideg / 1000.0
+        temp_millideg = int(_read_proc('/sys/class/thermal/thermal_zone0/temp', 32))
+        result["temperature"] = temp_millideg / 1000.0
     except Exception:
         pass
 
     # Disk free (root filesystem)
     try:
-        import shutil
-        usage = shutil.disk_usage("/")
-        result["disk_free"] = usage.free
+        st = os.statvfs("/")
+        result["disk_free"] = st.f_bavail * st.f_frsize  # == shutil.disk_usage().free
     except Exception:
         pass
 
     # Disk writes total (bytes written to SD card, from /proc/diskstats)
     # Tracks cumulative writes for SD card wear monitoring
     try:
-        with open('/proc/diskstats', 'r') as f:
-            total_sectors = 0
-            for line in f:
-                parts = line.split()
-                if len(parts) >= 10:
-                    dev_name = parts[2]
-                    # Match mmcblk* (SD card) or sd* (USB/SATA), skip partitions
-                    if (dev_name.startswith('mmcblk') and 'p' not in dev_name) or \
-                       (dev_name.startswith('sd') and dev_name[-1].isalpha()):
-                        # Field 10 (index 9) = sectors written
-                        total_sectors += int(parts[9])
-            if total_sectors > 0:
-                result["disk_writes_total"] = total_sectors * 512  # sectors -> bytes
+        total_sectors = 0
+        for line in _read_proc('/proc/diskstats', 32768).split(b'\n'):
+            # Most lines are partitions, loop/zram/dm devices; skip those
+            # before paying for the 20-field split
+            if b' mmcblk' not in line and b' sd' not in line:
+                continue
+            parts = line.split()
+            if len(parts) >= 10 and _DISK_DEV_RE.fullmatch(parts[2]):
+                # Field 10 (index 9) = sectors written
+                total_sectors += int(parts[9])
+        if total_sectors > 0:
+            result["disk_writes_total"] = total_sectors * 512  # sectors -> bytes
     except Exception:
         pass
 
@@ -125,25 +201,35 @@ class TapMetrics:
     Included in heartbeat payloads.
     """
 
-    def __init__(self, max_samples: int = 100):
-        self._frame_times: deque = deque(maxlen=max_samples)
+    def __init__(self, window_s: float = 1.0):
+        # record_frame() only bumps a counter (single writer: the capture
+        # thread); the rate is derived on read against the previous read.
+        self._count = 0
+        self._window_s = window_s
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._rate = 0.0
 
     def record_frame(self):
-        """Record a frame processing timestamp for rate calculation."""
-        self._frame_times.append(time.time())
+        """Count a processed frame for rate calculation."""
+        self._count += 1
 
     @property
     def frames_per_second(self) -> float:
-        """Calculate frames/sec from recent timestamps."""
-        if len(self._frame_times) < 2:
-            return 0.0
-        newest = self._frame_times[-1]
-        oldest = self._frame_times[0]
-        dt = newest - oldest
-        # Guard against clock jumps (NTP backward step or large forward jump)
-        if dt <= 0 or dt > 3600:
-            return 0.0
-        return (len(self._frame_times) - 1) / dt
+        """Frames/sec since the previous window rotation.
+
+        The window rotates on read once at least window_s has elapsed;
+        reads in between return the last computed rate. Monotonic time,
+        so NTP steps can't skew it.
+        """
+        now = time.monotonic()
+        dt = now - self._window_start
+        if dt >= self._window_s:
+            count = self._count
+            self._rate = (count - self._window_count) / dt
+            self._window_start = now
+            self._window_count = count
+        return self._rate
 
     def collect_all(
         self,
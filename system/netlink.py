@@ -3,6 +3,8 @@ Raw nl80211 netlink channel control.
 
 Sets WiFi monitor-mode channel via AF_NETLINK socket — zero subprocess forks.
 Typical channel switch: <1ms (vs ~50ms for subprocess `iw`).
+Also switches interface type (nl80211) and link up/down (rtnetlink) so
+monitor-mode setup needs no `iw`/`ip` either.
 
 Uses only stdlib (socket, struct). No external dependencies.
 """
@@ -11,10 +13,12 @@ import socket
 import struct
 import logging
 import threading
+from typing import Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 # Netlink constants
+NETLINK_ROUTE = 0
 NETLINK_GENERIC = 16
 NLM_F_REQUEST = 0x0001
 NLM_F_ACK = 0x0004
@@ -23,6 +27,10 @@ NLM_F_ACK = 0x0004
 NLMSG_ERROR = 2
 NLMSG_DONE = 3
 
+# rtnetlink (linux/rtnetlink.h, linux/if.h)
+RTM_NEWLINK = 16
+IFF_UP = 0x1
+
 # Generic netlink controller
 GENL_ID_CTRL = 0x10
 CTRL_CMD_GETFAMILY = 3
@@ -33,11 +41,71 @@ CTRL_ATTR_FAMILY_ID = 1
 # NL80211_CMD_SET_WIPHY (2) works with active monitor captures;
 # NL80211_CMD_SET_WIPHY (64) fails with -EOPNOTSUPP when dumpcap holds the VIF.
 NL80211_CMD_SET_WIPHY = 2
+NL80211_CMD_GET_INTERFACE = 5
+NL80211_CMD_SET_INTERFACE = 6
 NL80211_ATTR_IFINDEX = 3
+NL80211_ATTR_IFTYPE = 5
 NL80211_ATTR_WIPHY_FREQ = 38
 NL80211_ATTR_CHANNEL_WIDTH = 159
 NL80211_ATTR_CENTER_FREQ1 = 160
 NL80211_CHAN_WIDTH_20_NOHT = 0
+NL80211_IFTYPE_MONITOR = 6
+
+# nlmsghdr: len, type, flags, seq, pid
+_NLMSG_HDR = struct.Struct("IHHII")
+_NLMSG_SEQ_OFFSET = 8
+# nlattr: len, type / genlmsghdr: cmd, version, reserved / scalar fields
+_NLA_HDR = struct.Struct("HH")
+_GENL_HDR = struct.Struct("BBH")
+_U16 = struct.Struct("H")
+_U32 = struct.Struct("I")
+_S32 = struct.Struct("i")
+
+
+def _ack_error(data: bytes) -> Optional[int]:
+    """Return the errno of an NLMSG_ERROR reply (0 = ACK), or None if not one."""
+    if len(data) < 20:
+        return None
+    if _U16.unpack_from(data, 4)[0] != NLMSG_ERROR:
+        return None
+    return _S32.unpack_from(data, 16)[0]
+
+
+def set_link_up(ifindex: int, up: bool) -> bool:
+    """
+    Bring an interface up or down via rtnetlink (`ip link set <if> up|down`).
+
+    Needs CAP_NET_ADMIN.  Uses a short-lived NETLINK_ROUTE socket — this is
+    a setup-time call, not a hot path.
+
+    Returns:
+        True if the kernel acknowledged the change.
+    """
+    # ifinfomsg: family(1) + pad(1) + type(2) + index(4) + flags(4) + change(4)
+    ifinfo = struct.pack("BxHiII", socket.AF_UNSPEC, 0, ifindex,
+                         IFF_UP if up else 0, IFF_UP)
+    nlhdr = _NLMSG_HDR.pack(
+        16 + len(ifinfo),
+        RTM_NEWLINK,
+        NLM_F_REQUEST | NLM_F_ACK,
+        1,
+        0,
+    )
+    try:
+        with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE) as sock:
+            sock.bind((0, 0))
+            sock.settimeout(2.0)
+            sock.sendto(nlhdr + ifinfo, (0, 0))
+            data = sock.recv(4096)
+    except OSError as e:
+        logger.warning(f"rtnetlink set_link_up error: {e}")
+        return False
+
+    error_code = _ack_error(data)
+    if error_code != 0:
+        logger.debug(f"rtnetlink set_link_up failed: ifindex={ifindex} up={up} error={error_code}")
+        return False
+    return True
 
 
 def _nlattr(attr_type: int, data: bytes) -> bytes:
@@ -45,12 +113,12 @@ def _nlattr(attr_type: int, data: bytes) -> bytes:
     nla_len = 4 + len(data)  # 2 bytes len + 2 bytes type + payload
     # Pad to 4-byte alignment
     padded = nla_len + ((4 - (nla_len % 4)) % 4)
-    return struct.pack("HH", nla_len, attr_type) + data + b'\x00' * (padded - nla_len)
+    return _NLA_HDR.pack(nla_len, attr_type) + data + b'\x00' * (padded - nla_len)
 
 
 def _nlattr_u32(attr_type: int, value: int) -> bytes:
     """Build a U32 netlink attribute."""
-    return _nlattr(attr_type, struct.pack("I", value))
+    return _nlattr(attr_type, _U32.pack(value))
 
 
 def _nlattr_str(attr_type: int, value: str) -> bytes:
@@ -66,6 +134,11 @@ class NL80211Channel:
         self._family_id = None
         self._seq = 0
         self._lock = threading.Lock()
+        # Packed SET_WIPHY requests by (ifindex, freq); only nlmsg_seq is
+        # patched per hop.  A hopper cycles through a fixed set of channels.
+        self._set_channel_msgs: Dict[Tuple[int, int], bytearray] = {}
+        # ACK receive buffer for set_channel (used under _lock)
+        self._ack_buf = bytearray(4096)
 
         try:
             self._sock = socket.socket(
@@ -95,11 +168,10 @@ class NL80211Channel:
         payload = _nlattr_str(CTRL_ATTR_FAMILY_NAME, name)
 
         # genlmsghdr: cmd(1) + version(1) + reserved(2)
-        genlhdr = struct.pack("BBH", CTRL_CMD_GETFAMILY, 1, 0)
+        genlhdr = _GENL_HDR.pack(CTRL_CMD_GETFAMILY, 1, 0)
 
         msg_len = 16 + len(genlhdr) + len(payload)  # nlmsghdr is 16 bytes
-        nlhdr = struct.pack(
-            "IHHII",
+        nlhdr = _NLMSG_HDR.pack(
             msg_len,              # nlmsg_len
             GENL_ID_CTRL,         # nlmsg_type
             NLM_F_REQUEST | NLM_F_ACK,  # nlmsg_flags
@@ -107,7 +179,7 @@ class NL80211Channel:
             0,                    # nlmsg_pid
         )
 
-        self._sock.sendto(nlhdr + genlhdr + payload, (0, 0))
+        self._sock.sendmsg((nlhdr, genlhdr, payload))
 
         # Read response(s)
         while True:
@@ -115,12 +187,10 @@ class NL80211Channel:
             if len(data) < 16:
                 break
 
-            msg_len, msg_type, msg_flags, msg_seq, msg_pid = struct.unpack(
-                "IHHII", data[:16]
-            )
+            msg_len, msg_type, msg_flags, msg_seq, msg_pid = _NLMSG_HDR.unpack_from(data)
 
             if msg_type == NLMSG_ERROR:
-                error_code = struct.unpack("i", data[16:20])[0]
+                error_code = _S32.unpack_from(data, 16)[0]
                 if error_code == 0:
                     continue  # ACK, not error
                 logger.error(f"Netlink error resolving {name}: {error_code}")
@@ -131,24 +201,37 @@ class NL80211Channel:
 
             if msg_type == GENL_ID_CTRL:
                 # Parse attributes from response (skip nlmsghdr + genlmsghdr)
-                attrs_data = data[20:]
-                return self._parse_family_id(attrs_data)
+                return self._parse_family_id(data, 20)
 
         return None
 
-    def _parse_family_id(self, data: bytes) -> int:
-        """Extract CTRL_ATTR_FAMILY_ID from netlink attributes."""
-        offset = 0
-        while offset + 4 <= len(data):
-            nla_len, nla_type = struct.unpack("HH", data[offset:offset + 4])
+    def _parse_family_id(self, data: bytes, offset: int = 0) -> int:
+        """Extract CTRL_ATTR_FAMILY_ID from the netlink attributes at data[offset:]."""
+        end = len(data)
+        while offset + 4 <= end:
+            nla_len, nla_type = _NLA_HDR.unpack_from(data, offset)
             if nla_len < 4:
                 break
             if nla_type == CTRL_ATTR_FAMILY_ID:
-                return struct.unpack("H", data[offset + 4:offset + 6])[0]
+                return _U16.unpack_from(data, offset + 4)[0]
             # Advance to next attr (4-byte aligned)
             offset += (nla_len + 3) & ~3
         return None
 
+    def _recv_reply(self, seq: int) -> bytes:
+        """Receive the reply to request seq (caller holds _lock).
+
+        Replies to earlier timed-out requests are still queued on the
+        socket; they are skipped by seq, as in set_channel().
+        """
+        buf = self._ack_buf
+        while True:
+            n = self._sock.recv_into(buf)
+            if n < 16:
+                return b""
+            if _U32.unpack_from(buf, _NLMSG_SEQ_OFFSET)[0] == seq:
+                return bytes(buf[:n])
+
     def set_channel(self, ifindex: int, freq_mhz: int) -> bool:
         """
         Set channel on an interface by frequency.
@@ -165,21 +248,94 @@ class NL80211Channel:
 
         with self._lock:
             seq = self._next_seq()
+            key = (ifindex, freq_mhz)
+            msg = self._set_channel_msgs.get(key)
+            if msg is None:
+                msg = self._build_set_channel(ifindex, freq_mhz)
+                if len(self._set_channel_msgs) >= 256:
+                    self._set_channel_msgs.clear()  # stale ifindexes after recreates
+                self._set_channel_msgs[key] = msg
+            _U32.pack_into(msg, _NLMSG_SEQ_OFFSET, seq)
+
+            try:
+                # Bound socket: send() goes to the kernel (portid 0), so no
+                # per-hop address tuple for sendto() to convert.
+                self._sock.send(msg)
+
+                # Wait for ACK.  genetlink handles the request in our own
+                # send() context, so it is already queued; replies to
+                # earlier timed-out requests are skipped by seq.
+                buf = self._ack_buf
+                while True:
+                    if self._sock.recv_into(buf) < 20:
+                        return False
+                    msg_len, msg_type, msg_flags, msg_seq, msg_pid = _NLMSG_HDR.unpack_from(buf)
+                    if msg_seq == seq:
+                        break
+
+                if msg_type == NLMSG_ERROR:
+                    error_code = _S32.unpack_from(buf, 16)[0]
+                    if error_code == 0:
+                        return True  # ACK = success
+                    logger.debug(
+                        f"nl80211 set_channel failed: ifindex={ifindex} "
+                        f"freq={freq_mhz} error={error_code}"
+                    )
+                    return False
 
-            # Build attributes
+                return True
+
+            except socket.timeout:
+                logger.warning("nl80211 set_channel timed out")
+                return False
+            except OSError as e:
+                logger.warning(f"nl80211 set_channel error: {e}")
+                return False
+
+    def _build_set_channel(self, ifindex: int, freq_mhz: int) -> bytearray:
+        """Pack a 20 MHz NL80211_CMD_SET_WIPHY request (nlmsg_seq left 0)."""
+        attrs = (
+            _nlattr_u32(NL80211_ATTR_IFINDEX, ifindex) +
+            _nlattr_u32(NL80211_ATTR_WIPHY_FREQ, freq_mhz) +
+            _nlattr_u32(NL80211_ATTR_CHANNEL_WIDTH, NL80211_CHAN_WIDTH_20_NOHT) +
+            _nlattr_u32(NL80211_ATTR_CENTER_FREQ1, freq_mhz)
+        )
+
+        # genlmsghdr: cmd + version + reserved
+        genlhdr = _GENL_HDR.pack(NL80211_CMD_SET_WIPHY, 0, 0)
+
+        msg_len = 16 + len(genlhdr) + len(attrs)
+        nlhdr = _NLMSG_HDR.pack(
+            msg_len,
+            self._family_id,
+            NLM_F_REQUEST | NLM_F_ACK,
+            0,
+            0,
+        )
+        return bytearray(nlhdr + genlhdr + attrs)
+
+    def set_iftype(self, ifindex: int, iftype: int) -> bool:
+        """
+        Change an interface's type (e.g. NL80211_IFTYPE_MONITOR).
+
+        The interface must be down; most drivers return -EBUSY otherwise.
+
+        Returns:
+            True if the kernel acknowledged the change.
+        """
+        if self._sock is None:
+            return False
+
+        with self._lock:
+            seq = self._next_seq()
             attrs = (
                 _nlattr_u32(NL80211_ATTR_IFINDEX, ifindex) +
-                _nlattr_u32(NL80211_ATTR_WIPHY_FREQ, freq_mhz) +
-                _nlattr_u32(NL80211_ATTR_CHANNEL_WIDTH, NL80211_CHAN_WIDTH_20_NOHT) +
-                _nlattr_u32(NL80211_ATTR_CENTER_FREQ1, freq_mhz)
+                _nlattr_u32(NL80211_ATTR_IFTYPE, iftype)
             )
-
-            # genlmsghdr: cmd + version + reserved
-            genlhdr = struct.pack("BBH", NL80211_CMD_SET_WIPHY, 0, 0)
+            genlhdr = _GENL_HDR.pack(NL80211_CMD_SET_INTERFACE, 0, 0)
 
             msg_len = 16 + len(genlhdr) + len(attrs)
-            nlhdr = struct.pack(
-                "IHHII",
+            nlhdr = _NLMSG_HDR.pack(
                 msg_len,
                 self._family_id,
                 NLM_F_REQUEST | NLM_F_ACK,
@@ -188,35 +344,88 @@ class NL80211Channel:
             )
 
             try:
-                self._sock.sendto(nlhdr + genlhdr + attrs, (0, 0))
+                self._sock.sendmsg((nlhdr, genlhdr, attrs))
+                data = self._recv_reply(seq)
+            except socket.timeout:
+                logger.warning("nl80211 set_iftype timed out")
+                return False
+            except OSError as e:
+                logger.warning(f"nl80211 set_iftype error: {e}")
+                return False
 
-                # Wait for ACK
-                data = self._sock.recv(4096)
-                if len(data) < 20:
-                    return False
+        error_code = _ack_error(data)
+        if error_code != 0:
+            logger.debug(
+                f"nl80211 set_iftype failed: ifindex={ifindex} "
+                f"iftype={iftype} error={error_code}"
+            )
+            return False
+        return True
 
-                msg_len, msg_type, msg_flags, msg_seq, msg_pid = struct.unpack(
-                    "IHHII", data[:16]
-                )
+    def get_interface(self, ifindex: int) -> Optional[dict]:
+        """
+        Query an interface's type and current frequency (NL80211_CMD_GET_INTERFACE).
 
-                if msg_type == NLMSG_ERROR:
-                    error_code = struct.unpack("i", data[16:20])[0]
-                    if error_code == 0:
-                        return True  # ACK = success
-                    logger.debug(
-                        f"nl80211 set_channel failed: ifindex={ifindex} "
-                        f"freq={freq_mhz} error={error_code}"
-                    )
-                    return False
+        Args:
+            ifindex: Network interface index
 
-                return True
+        Returns:
+            {"iftype": int, "freq": int or None}, or None on error
+            (no such interface, not a wireless device, timeout).
+        """
+        if self._sock is None:
+            return None
 
+        with self._lock:
+            seq = self._next_seq()
+            attrs = _nlattr_u32(NL80211_ATTR_IFINDEX, ifindex)
+            genlhdr = _GENL_HDR.pack(NL80211_CMD_GET_INTERFACE, 0, 0)
+
+            msg_len = 16 + len(genlhdr) + len(attrs)
+            # No NLM_F_ACK: the reply (or an error) is the only message, so
+            # nothing is left queued for the next request to skip.
+            nlhdr = _NLMSG_HDR.pack(
+                msg_len,
+                self._family_id,
+                NLM_F_REQUEST,
+                seq,
+                0,
+            )
+
+            try:
+                self._sock.sendmsg((nlhdr, genlhdr, attrs))
+                data = self._recv_reply(seq)
             except socket.timeout:
-                logger.warning("nl80211 set_channel timed out")
-                return False
+                logger.warning("nl80211 get_interface timed out")
+                return None
             except OSError as e:
-                logger.warning(f"nl80211 set_channel error: {e}")
-                return False
+                logger.warning(f"nl80211 get_interface error: {e}")
+                return None
+
+        if len(data) < 20:
+            return None
+        msg_type = _U16.unpack_from(data, 4)[0]
+        if msg_type == NLMSG_ERROR:
+            error_code = _S32.unpack_from(data, 16)[0]
+            logger.debug(f"nl80211 get_interface failed: ifindex={ifindex} error={error_code}")
+            return None
+        if msg_type != self._family_id:
+            return None
+
+        info = {"iftype": None, "freq": None}
+        msg_len = _U32.unpack_from(data)[0]
+        offset = 20  # nlmsghdr + genlmsghdr
+        end = min(msg_len, len(data))
+        while offset + 4 <= end:
+            nla_len, nla_type = _NLA_HDR.unpack_from(data, offset)
+            if nla_len < 4:
+                break
+            if nla_type == NL80211_ATTR_IFTYPE:
+                info["iftype"] = _U32.unpack_from(data, offset + 4)[0]
+            elif nla_type == NL80211_ATTR_WIPHY_FREQ:
+                info["freq"] = _U32.unpack_from(data, offset + 4)[0]
+            offset += (nla_len + 3) & ~3
+        return info
 
     def close(self):
         """Close the netlink socket."""
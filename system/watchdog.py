@@ -29,6 +29,12 @@ class Watchdog:
     Runs as a background thread alongside the main capture loop.
     """
 
+    # Memory checks (a fresh /proc sample each) back off by 1.5x per check
+    # up to this while usage stays MEM_CHECK_HEADROOM_PCT below the
+    # threshold; liveness checks stay on every tick.
+    MEM_CHECK_MAX_INTERVAL_S = 30.0
+    MEM_CHECK_HEADROOM_PCT = 10.0
+
     def __init__(
         self,
         capture,  # TsharkCapture instance
@@ -78,6 +84,8 @@ class Watchdog:
         self._last_frame_count = 0
         self._last_tshark_lines = 0
         self._last_frame_check_time = 0.0
+        self._mem_check_interval_s = check_interval_s
+        self._next_mem_check = 0.0
         self._stats = {
             "restarts": 0,
             "interface_resets": 0,
@@ -109,6 +117,7 @@ class Watchdog:
         self._last_frame_check_time = time.time()
 
         while self._running:
+            incidents = sum(self._stats.values())
             try:
                 # --- Check 1: tshark process alive ---
                 if not self.capture.is_running:
@@ -147,6 +156,11 @@ class Watchdog:
             except Exception as e:
                 logger.error(f"Watchdog error: {e}")
 
+            if sum(self._stats.values()) != incidents:
+                # Something went wrong this tick: watch memory closely again
+                self._mem_check_interval_s = self._check_interval_s
+                self._next_mem_check = 0.0
+
             time.sleep(self._check_interval_s)
 
     def _check_pipeline_throughput(self):
@@ -189,9 +203,19 @@ class Watchdog:
 
     def _check_memory_pressure(self):
         """Exit if memory usage exceeds threshold. systemd Restart=always will bring us back."""
+        now = time.monotonic()
+        if now < self._next_mem_check:
+            return
         try:
-            health = get_system_health()
+            health = get_system_health(max_age_s=0)  # never act on a stale sample
             mem_pct = health.get("memory_percent", 0.0)
+            if mem_pct < self.memory_percent_threshold - self.MEM_CHECK_HEADROOM_PCT:
+                self._mem_check_interval_s = min(
+                    self._mem_check_interval_s * 1.5, self.MEM_CHECK_MAX_INTERVAL_S
+                )
+            else:
+                self._mem_check_interval_s = self._check_interval_s
+            self._next_mem_check = now + self._mem_check_interval_s
             if mem_pct > self.memory_percent_threshold:
                 with self._lock:
                     self._stats["memory_kills"] += 1
@@ -237,6 +261,15 @@ class Watchdog:
         with self._lock:
             self._stats["interface_resets"] += 1
 
+        # Fast path: rtnetlink + nl80211, no fork/exec per step
+        try:
+            from nozyme_tap.core.capture import reset_monitor_interface
+            if reset_monitor_interface(self.interface, self.channel):
+                logger.info(f"Interface {self.interface} reset complete (netlink)")
+                return
+        except Exception as e:
+            logger.debug(f"netlink interface reset error: {e}")
+
         is_root = os.geteuid() == 0
         commands = [
             ["ip", "link", "set", self.interface, "down"],